@@ -7,6 +7,12 @@ import requests
 import uuid
 import re
 
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
 url = 'https://live.douyin.com/198671092027'
 
 headers = {
@@ -18,7 +24,16 @@ headers = {
 
 cookies = {'__ac_nonce': uuid.uuid4().hex[:21]}
 
-r = requests.get(url, headers=headers, cookies=cookies, timeout=10)
+# Respaldo sin selectolax: patrones compilados una sola vez
+SCRIPT_RE = re.compile(r'<script[^>]*>(.*?)</script>', re.DOTALL)
+META_RE = re.compile(r'<meta[^>]+>')
+LINK_RE = re.compile(r'<link[^>]+>')
+URL_RE = re.compile(r'https?://[^\s<>"]+')
+
+session = requests.Session()
+session.headers.update(headers)
+
+r = session.get(url, cookies=cookies, timeout=10)
 
 print("="*70)
 print("ANÁLISIS COMPLETO DEL HTML")
@@ -33,27 +48,42 @@ print("\n" + "="*70)
 print("BÚSQUEDA DE PATRONES:")
 print("="*70)
 
+html = r.text
+
+if SELECTOLAX_AVAILABLE:
+    # Un solo parseo; luego se consulta el árbol por etiqueta
+    tree = LexborHTMLParser(html)
+    scripts = [node.text() for node in tree.css('script')]
+    metas = [node.html for node in tree.css('meta')]
+    links = [node.html for node in tree.css('link')]
+else:
+    scripts = SCRIPT_RE.findall(html)
+    metas = META_RE.findall(html)
+    links = LINK_RE.findall(html)
+
 # Buscar todos los scripts
-scripts = re.findall(r'<script[^>]*>(.*?)</script>', r.text, re.DOTALL)
 print(f"\nScripts encontrados: {len(scripts)}")
 for i, script in enumerate(scripts):
     print(f"\n--- Script {i+1} ---")
     print(script[:500] if len(script) > 500 else script)
 
 # Buscar meta tags
-metas = re.findall(r'<meta[^>]+>', r.text)
 print(f"\n\nMeta tags: {len(metas)}")
 for meta in metas:
     print(meta)
 
 # Buscar links
-links = re.findall(r'<link[^>]+>', r.text)
 print(f"\n\nLinks: {len(links)}")
 for link in links:
     print(link)
 
-# Buscar cualquier URL
-all_urls = re.findall(r'https?://[^\s<>"]+', r.text)
-print(f"\n\nTodas las URLs encontradas: {len(all_urls)}")
-for url_found in all_urls[:20]:
+# Buscar cualquier URL: una sola pasada, solo se guardan las 20 primeras
+first_urls = []
+url_count = 0
+for match in URL_RE.finditer(html):
+    if url_count < 20:
+        first_urls.append(match.group())
+    url_count += 1
+print(f"\n\nTodas las URLs encontradas: {url_count}")
+for url_found in first_urls:
     print(url_found)
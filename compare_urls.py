@@ -5,6 +5,7 @@ Comparación: URL que funcionaba vs URL nueva
 import requests
 import uuid
 import re
+from concurrent.futures import ThreadPoolExecutor
 
 # URL que funcionaba antes
 url_old = 'https://live.douyin.com/94782239787'
@@ -20,31 +21,57 @@ headers = {
 
 cookies = {'__ac_nonce': uuid.uuid4().hex[:21]}
 
+# Patrones compilados una vez y compartidos por ambas URLs
+FLV_RE = re.compile(r'"(https?://[^"]+\.flv[^"]*)"')
+M3U8_RE = re.compile(r'"(https?://[^"]+\.m3u8[^"]*)"')
+
+# Una sola sesión: ambas URLs comparten host y su pool de conexiones
+session = requests.Session()
+session.headers.update(headers)
+
+
+def fetch_and_analyze(name, url):
+    """Descarga una URL y devuelve sus métricas (se ejecuta en un hilo)."""
+    r = session.get(url, cookies=cookies, timeout=10)
+    html = r.text  # r.text se decodifica en cada acceso
+    
+    return {
+        'name': name,
+        'url': url,
+        'status': r.status_code,
+        'length': len(html),
+        # Buscar URLs
+        'flv_urls': FLV_RE.findall(html),
+        'm3u8_urls': M3U8_RE.findall(html),
+        # Buscar patrones (literales: str.count basta, sin regex)
+        'pace_f': html.count('__pace_f'),
+        # Buscar scripts
+        'scripts': html.count('<script'),
+    }
+
+
 print("="*70)
 print("COMPARACIÓN DE URLs")
 print("="*70)
 
-for name, url in [("URL Antigua", url_old), ("URL Nueva", url_new)]:
-    print(f"\n[{name}] {url}")
+# Las descargas son independientes: se solapan en paralelo
+targets = [("URL Antigua", url_old), ("URL Nueva", url_new)]
+with ThreadPoolExecutor(max_workers=len(targets)) as executor:
+    results = list(executor.map(lambda target: fetch_and_analyze(*target), targets))
+
+# Imprimir en el orden original
+for result in results:
+    print(f"\n[{result['name']}] {result['url']}")
     print("-"*70)
     
-    r = requests.get(url, headers=headers, cookies=cookies, timeout=10)
-    print(f"Status: {r.status_code}")
-    print(f"HTML Length: {len(r.text)} bytes")
+    print(f"Status: {result['status']}")
+    print(f"HTML Length: {result['length']} bytes")
     
-    # Buscar URLs
-    flv_urls = re.findall(r'"(https?://[^"]+\.flv[^"]*)"', r.text)
-    m3u8_urls = re.findall(r'"(https?://[^"]+\.m3u8[^"]*)"', r.text)
+    flv_urls = result['flv_urls']
     print(f"FLV URLs: {len(flv_urls)}")
-    print(f"M3U8 URLs: {len(m3u8_urls)}")
-    
-    # Buscar patrones
-    pace_f = len(re.findall(r'__pace_f', r.text))
-    print(f"__pace_f: {pace_f}")
-    
-    # Buscar scripts
-    scripts = len(re.findall(r'<script', r.text))
-    print(f"Scripts: {scripts}")
+    print(f"M3U8 URLs: {len(result['m3u8_urls'])}")
+    print(f"__pace_f: {result['pace_f']}")
+    print(f"Scripts: {result['scripts']}")
     
     if flv_urls:
         print(f"\n✓ ENCONTRÓ STREAM!")
@@ -3,12 +3,90 @@ DouyinStream Pro - Settings Manager
 Singleton pattern for centralized configuration management.
 """
 
+import atexit
+import hashlib
 import json
 import os
+import shutil
 import winreg
+from functools import cache
 from pathlib import Path
 from typing import Any, Callable, Optional
-from threading import Lock
+from threading import Lock, Timer
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Sentinel for settings lookups where None is a legitimate stored value
+_MISSING = object()
+
+# Players tracked by the persisted detection cache
+PLAYER_KEYS = ("vlc", "mpv", "ffplay")
+
+# VLC registry keys: native first, then 32-bit VLC on 64-bit Windows
+_VLC_REGISTRY_KEYS = (
+    r"SOFTWARE\VideoLAN\VLC",
+    r"SOFTWARE\WOW6432Node\VideoLAN\VLC",
+)
+
+
+@cache
+def _query_vlc_registry() -> Optional[str]:
+    """Return vlc.exe from the VLC InstallDir registry value, if installed."""
+    for subkey in _VLC_REGISTRY_KEYS:
+        try:
+            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, subkey) as key:
+                install_dir = winreg.QueryValueEx(key, "InstallDir")[0]
+                vlc_path = os.path.join(install_dir, "vlc.exe")
+                if os.path.isfile(vlc_path):
+                    return vlc_path
+        except (WindowsError, FileNotFoundError, OSError):
+            pass
+    return None
+
+
+@cache
+def _which_cached(name: str, path: str, pathext: str) -> Optional[str]:
+    """shutil.which memoized per (PATH, PATHEXT); pathext only keys the cache."""
+    return shutil.which(name, path=path)
+
+
+def _which(name: str) -> Optional[str]:
+    """Look up an executable on PATH, reusing earlier results for the same environment."""
+    return _which_cached(name, os.environ.get("PATH", ""), os.environ.get("PATHEXT", ""))
+
+
+@cache
+def _first_existing(paths: tuple) -> Optional[str]:
+    """
+    Return the first path in paths that is a file (tuple so it can be cached).
+    Each parent directory is listed once with os.scandir instead of one
+    stat() per candidate; a missing directory costs a single failed call.
+    DirEntry.is_file() uses the type info scandir already returned.
+    """
+    listings: dict[str, set] = {}
+    for path in paths:
+        parent, name = os.path.split(path)
+        if parent not in listings:
+            try:
+                with os.scandir(parent) as entries:
+                    # Windows file names are case-insensitive
+                    listings[parent] = {entry.name.lower() for entry in entries if entry.is_file()}
+            except OSError:
+                listings[parent] = set()
+        if name.lower() in listings[parent]:
+            return path
+    return None
+
+
+def _clear_probe_caches() -> None:
+    """Forget in-process probe results so the next lookup hits the system again."""
+    _query_vlc_registry.cache_clear()
+    _first_existing.cache_clear()
+    _which_cached.cache_clear()
 
 
 class SettingsManager:
@@ -37,21 +115,26 @@ class SettingsManager:
         "window_geometry": "1200x800",
     }
     
-    # Common VLC installation paths on Windows
-    VLC_SEARCH_PATHS: list[str] = [
+    # Delay before coalesced writes hit the disk
+    SAVE_DEBOUNCE_SEC: float = 0.5
+    
+    # Common VLC installation paths on Windows, expanded once at class load.
+    # Entries whose environment variable is unset (still contain "%") are dropped.
+    VLC_SEARCH_PATHS: tuple[str, ...] = tuple(p for p in (
         r"C:\Program Files\VideoLAN\VLC\vlc.exe",
         r"C:\Program Files (x86)\VideoLAN\VLC\vlc.exe",
         os.path.expandvars(r"%LOCALAPPDATA%\Programs\VideoLAN\VLC\vlc.exe"),
         os.path.expandvars(r"%APPDATA%\VLC\vlc.exe"),
-    ]
+    ) if "%" not in p)
     
     # Common MPV paths
-    MPV_SEARCH_PATHS: list[str] = [
+    MPV_SEARCH_PATHS: tuple[str, ...] = tuple(p for p in (
         r"C:\Program Files\mpv\mpv.exe",
         r"C:\Program Files (x86)\mpv\mpv.exe",
         os.path.expandvars(r"%LOCALAPPDATA%\Programs\mpv\mpv.exe"),
         os.path.expandvars(r"%USERPROFILE%\scoop\apps\mpv\current\mpv.exe"),
-    ]
+        os.path.expandvars(r"%USERPROFILE%\scoop\shims\mpv.exe"),
+    ) if "%" not in p)
     
     def __new__(cls) -> 'SettingsManager':
         if cls._instance is None:
@@ -68,30 +151,65 @@ class SettingsManager:
         self._initialized = True
         self._observers: list[Callable[[str, Any], None]] = []
         self._settings: dict[str, Any] = {}
+        self._save_lock = Lock()  # guards _settings mutations and _save_timer
+        self._write_lock = Lock()  # serializes settings.json writers
+        self._save_timer: Optional[Timer] = None
+        self._player_cache: Optional[dict[str, Any]] = None
+        self._player_lock = Lock()
         
         # Setup data directory
         self._data_dir = Path(__file__).parent.parent / "data"
         self._data_dir.mkdir(exist_ok=True)
         self._settings_file = self._data_dir / "settings.json"
+        self._player_cache_file = self._data_dir / "player_cache.json"
         
         # Load or create settings
         self._load_settings()
         
+        # Make sure debounced writes are not lost on interpreter exit
+        atexit.register(self.flush)
+        
         # Auto-detect players if not configured
         if not self._settings.get("external_player_path"):
-            detected = self._detect_vlc() or self._detect_mpv()
+            paths = self.get_player_paths()
+            detected = paths["vlc"] or paths["mpv"]
             if detected:
-                self._settings["external_player_path"] = detected
+                with self._save_lock:
+                    self._settings["external_player_path"] = detected
                 self._save_settings()
     
+    @staticmethod
+    def _read_json(path: Path) -> Any:
+        """Parse a JSON file with orjson when available."""
+        if ORJSON_AVAILABLE:
+            return orjson.loads(path.read_bytes())
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    @staticmethod
+    def _write_json(path: Path, data: Any) -> None:
+        """Write data as JSON atomically (temp file + rename)."""
+        tmp_file = path.with_suffix(path.suffix + ".tmp")
+        if ORJSON_AVAILABLE:
+            # NON_STR_KEYS: accept int/float keys like the json fallback
+            tmp_file.write_bytes(orjson.dumps(
+                data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+            ))
+        else:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_file, path)
+    
     def _load_settings(self) -> None:
         """Load settings from JSON file or create defaults."""
         if self._settings_file.exists():
             try:
-                with open(self._settings_file, 'r', encoding='utf-8') as f:
-                    loaded = json.load(f)
-                    # Merge with defaults to handle new settings
-                    self._settings = {**self.DEFAULTS, **loaded}
+                loaded = self._read_json(self._settings_file)
+                # Player detection now lives in player_cache.json
+                loaded.pop("_player_cache", None)
+                loaded.pop("_detected_players", None)
+                # Merge with defaults to handle new settings
+                self._settings = {**self.DEFAULTS, **loaded}
             except (json.JSONDecodeError, IOError):
                 self._settings = self.DEFAULTS.copy()
         else:
@@ -99,74 +217,75 @@ class SettingsManager:
             self._save_settings()
     
     def _save_settings(self) -> None:
-        """Persist settings to JSON file."""
-        try:
-            with open(self._settings_file, 'w', encoding='utf-8') as f:
-                json.dump(self._settings, f, indent=2, ensure_ascii=False)
-        except IOError as e:
-            print(f"[SettingsManager] Error saving settings: {e}")
-    
-    def _detect_vlc(self) -> Optional[str]:
         """
-        Detect VLC installation via Windows Registry and common paths.
-        Returns path to vlc.exe if found.
+        Persist settings to JSON file atomically (temp file + rename).
+        Safe from any thread: the snapshot is taken under _save_lock and
+        the write is serialized, so the newest snapshot always lands last.
         """
-        # Try Windows Registry first
-        try:
-            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, 
-                               r"SOFTWARE\VideoLAN\VLC") as key:
-                install_dir = winreg.QueryValueEx(key, "InstallDir")[0]
-                vlc_path = os.path.join(install_dir, "vlc.exe")
-                if os.path.exists(vlc_path):
-                    return vlc_path
-        except (WindowsError, FileNotFoundError):
-            pass
-        
-        # Try common paths
-        for path in self.VLC_SEARCH_PATHS:
-            if os.path.exists(path):
-                return path
-        
-        return None
+        with self._write_lock:
+            with self._save_lock:
+                data = dict(self._settings)
+            try:
+                self._write_json(self._settings_file, data)
+            except (OSError, TypeError) as e:
+                # TypeError covers unserializable values (orjson.JSONEncodeError too)
+                print(f"[SettingsManager] Error saving settings: {e}")
+    
+    def _schedule_save(self) -> None:
+        """Coalesce bursts of set() calls into a single delayed write."""
+        with self._save_lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+            self._save_timer = Timer(self.SAVE_DEBOUNCE_SEC, self.flush)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+    
+    def flush(self) -> None:
+        """Write any pending settings change to disk immediately."""
+        with self._save_lock:
+            if self._save_timer is None:
+                return
+            self._save_timer.cancel()
+            self._save_timer = None
+        self._save_settings()
+    
+    def _detect_vlc(self) -> Optional[str]:
+        """Detect VLC via registry (native and 32-bit), common paths, then PATH."""
+        return (
+            _query_vlc_registry()
+            or _first_existing(self.VLC_SEARCH_PATHS)
+            or _which("vlc")
+        )
     
     def _detect_mpv(self) -> Optional[str]:
-        """
-        Detect MPV installation via PATH and common locations.
-        Returns path to mpv.exe if found.
-        """
-        # Check PATH
-        import shutil
-        mpv_in_path = shutil.which("mpv")
-        if mpv_in_path:
-            return mpv_in_path
-        
-        # Try common paths
-        for path in self.MPV_SEARCH_PATHS:
-            if os.path.exists(path):
-                return path
-        
-        return None
+        """Detect MPV via PATH, then common locations."""
+        return _which("mpv") or _first_existing(self.MPV_SEARCH_PATHS)
     
     def _detect_ffplay(self) -> Optional[str]:
         """Detect ffplay (comes with FFmpeg)."""
-        import shutil
-        return shutil.which("ffplay")
+        return _which("ffplay")
     
     def get(self, key: str, default: Any = None) -> Any:
         """Get a setting value."""
-        return self._settings.get(key, default if default is not None else self.DEFAULTS.get(key))
+        value = self._settings.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        return default if default is not None else self.DEFAULTS.get(key)
     
     def set(self, key: str, value: Any) -> None:
         """Set a setting value and notify observers."""
-        old_value = self._settings.get(key)
-        if old_value != value:
-            self._settings[key] = value
-            self._save_settings()
+        with self._save_lock:
+            changed = self._settings.get(key) != value
+            if changed:
+                self._settings[key] = value
+        if changed:
+            self._schedule_save()
             self._notify_observers(key, value)
     
     def get_all(self) -> dict[str, Any]:
         """Get all settings as a dictionary."""
-        return self._settings.copy()
+        with self._save_lock:
+            return self._settings.copy()
     
     def add_observer(self, callback: Callable[[str, Any], None]) -> None:
         """Add an observer to be notified of setting changes."""
@@ -190,11 +309,15 @@ class SettingsManager:
         """
         Get list of all available media players.
         Returns list of dicts with 'name', 'type', and 'path'.
+        
+        Paths come from get_player_paths(), so warm calls skip the
+        registry, filesystem and PATH probes for players already found.
         """
+        paths = self.get_player_paths()
         players = []
         
         # Check VLC
-        vlc_path = self._detect_vlc()
+        vlc_path = paths.get("vlc")
         if vlc_path:
             players.append({
                 "name": "VLC Media Player",
@@ -204,7 +327,7 @@ class SettingsManager:
             })
         
         # Check MPV
-        mpv_path = self._detect_mpv()
+        mpv_path = paths.get("mpv")
         if mpv_path:
             players.append({
                 "name": "MPV",
@@ -214,7 +337,7 @@ class SettingsManager:
             })
         
         # Check ffplay
-        ffplay_path = self._detect_ffplay()
+        ffplay_path = paths.get("ffplay")
         if ffplay_path:
             players.append({
                 "name": "FFplay",
@@ -225,12 +348,66 @@ class SettingsManager:
         
         return players
     
+    def get_player_paths(self, refresh: bool = False) -> dict[str, Optional[str]]:
+        """
+        Return detected player paths (a copy) keyed by PLAYER_KEYS.
+        Persisted in player_cache.json keyed by a hash of %PATH%. Players that
+        were not found, or whose executable is gone, are probed again on each
+        call; refresh re-probes everything.
+        """
+        path_hash = hashlib.blake2b(
+            os.environ.get("PATH", "").encode(), digest_size=8
+        ).hexdigest()
+        detectors = {
+            "vlc": self._detect_vlc,
+            "mpv": self._detect_mpv,
+            "ffplay": self._detect_ffplay,
+        }
+        
+        with self._player_lock:
+            cached = self._player_cache
+            if cached is None:
+                try:
+                    cached = self._read_json(self._player_cache_file)
+                except (ValueError, OSError):
+                    cached = None
+                if not isinstance(cached, dict):
+                    cached = {}
+            
+            if refresh or cached.get("path_hash") != path_hash:
+                # Explicit rescan or PATH changed: drop in-process probe results
+                _clear_probe_caches()
+                stale = PLAYER_KEYS
+            else:
+                stale = tuple(k for k in PLAYER_KEYS
+                              if not (cached.get(k) and os.path.isfile(cached[k])))
+                if any(cached.get(k) for k in stale):
+                    # A cached executable disappeared: don't trust memoized probes
+                    _clear_probe_caches()
+            
+            if stale:
+                updated = {**cached, "path_hash": path_hash}
+                updated.update((k, detectors[k]()) for k in stale)
+                if updated != cached:
+                    try:
+                        self._write_json(self._player_cache_file, updated)
+                    except (OSError, TypeError) as e:
+                        print(f"[SettingsManager] Error saving player cache: {e}")
+                cached = updated
+            
+            self._player_cache = cached
+            return {k: cached.get(k) for k in PLAYER_KEYS}
+    
     def get_download_path(self) -> Path:
         """Get download path, creating it if necessary."""
         path = Path(self.get("download_path"))
         path.mkdir(parents=True, exist_ok=True)
         return path
     
+    def get_data_path(self) -> Path:
+        """Get the app data directory (settings and other persisted caches)."""
+        return self._data_dir
+    
     def get_temp_path(self) -> Path:
         """Get temp path for buffer segments."""
         temp_path = Path(os.environ.get("TEMP", "/tmp")) / "douyinstream"
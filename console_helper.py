@@ -6,31 +6,67 @@ import ctypes
 import ctypes.wintypes
 import time
 
+MONITOR_DEFAULTTONEAREST = 2
+
+class MONITORINFO(ctypes.Structure):
+    _fields_ = [
+        ("cbSize", ctypes.wintypes.DWORD),
+        ("rcMonitor", ctypes.wintypes.RECT),
+        ("rcWork", ctypes.wintypes.RECT),
+        ("dwFlags", ctypes.wintypes.DWORD),
+    ]
+
+# Private DLL handles so the prototypes below don't leak into other modules
+# (core.monitor_utils passes its own POINT/RECT structs to the shared windll)
+try:
+    _user32 = ctypes.WinDLL("user32")
+    _kernel32 = ctypes.WinDLL("kernel32")
+
+    _user32.GetCursorPos.argtypes = [ctypes.POINTER(ctypes.wintypes.POINT)]
+    _user32.GetCursorPos.restype = ctypes.wintypes.BOOL
+    _user32.MonitorFromPoint.argtypes = [ctypes.wintypes.POINT, ctypes.wintypes.DWORD]
+    _user32.MonitorFromPoint.restype = ctypes.wintypes.HMONITOR
+    _user32.GetMonitorInfoW.argtypes = [ctypes.wintypes.HMONITOR, ctypes.POINTER(MONITORINFO)]
+    _user32.GetMonitorInfoW.restype = ctypes.wintypes.BOOL
+    _user32.GetWindowRect.argtypes = [ctypes.wintypes.HWND, ctypes.POINTER(ctypes.wintypes.RECT)]
+    _user32.GetWindowRect.restype = ctypes.wintypes.BOOL
+    _user32.SetWindowPos.argtypes = [
+        ctypes.wintypes.HWND, ctypes.wintypes.HWND,
+        ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+        ctypes.wintypes.UINT,
+    ]
+    _user32.SetWindowPos.restype = ctypes.wintypes.BOOL
+    _kernel32.GetConsoleWindow.argtypes = []
+    _kernel32.GetConsoleWindow.restype = ctypes.wintypes.HWND
+except (AttributeError, OSError):
+    # Not on Windows - the functions below fall back to defaults
+    _user32 = None
+    _kernel32 = None
+
+# Console window handle never changes for the process lifetime
+_console_hwnd = None
+
+def _get_console_hwnd():
+    """Return the console window handle, querying Windows only once."""
+    global _console_hwnd
+    if _console_hwnd is None:
+        _console_hwnd = _kernel32.GetConsoleWindow()
+    return _console_hwnd
+
 def get_monitor_at_cursor():
     """Get monitor bounds (x, y, w, h) at current cursor position using Windows API."""
     try:
-        user32 = ctypes.windll.user32
-        
         # Get cursor position
         point = ctypes.wintypes.POINT()
-        user32.GetCursorPos(ctypes.byref(point))
+        _user32.GetCursorPos(ctypes.byref(point))
         
         # Get monitor from point
-        MONITOR_DEFAULTTONEAREST = 2
-        hMonitor = user32.MonitorFromPoint(point, MONITOR_DEFAULTTONEAREST)
+        hMonitor = _user32.MonitorFromPoint(point, MONITOR_DEFAULTTONEAREST)
         
         # Get monitor info
-        class MONITORINFO(ctypes.Structure):
-            _fields_ = [
-                ("cbSize", ctypes.wintypes.DWORD),
-                ("rcMonitor", ctypes.wintypes.RECT),
-                ("rcWork", ctypes.wintypes.RECT),
-                ("dwFlags", ctypes.wintypes.DWORD),
-            ]
-        
         mi = MONITORINFO()
         mi.cbSize = ctypes.sizeof(MONITORINFO)
-        user32.GetMonitorInfoW(hMonitor, ctypes.byref(mi))
+        _user32.GetMonitorInfoW(hMonitor, ctypes.byref(mi))
         
         r = mi.rcWork  # Use work area (excludes taskbar)
         return (r.left, r.top, r.right - r.left, r.bottom - r.top)
@@ -41,10 +77,7 @@ def get_monitor_at_cursor():
 def center_console_on_mouse_monitor():
     """Move the console window to the monitor where the mouse cursor is."""
     try:
-        kernel32 = ctypes.windll.kernel32
-        user32 = ctypes.windll.user32
-        
-        hwnd = kernel32.GetConsoleWindow()
+        hwnd = _get_console_hwnd()
         if not hwnd:
             return
         
@@ -53,7 +86,7 @@ def center_console_on_mouse_monitor():
         
         # Get current window size
         rect = ctypes.wintypes.RECT()
-        user32.GetWindowRect(hwnd, ctypes.byref(rect))
+        _user32.GetWindowRect(hwnd, ctypes.byref(rect))
         win_w = rect.right - rect.left
         win_h = rect.bottom - rect.top
         
@@ -61,8 +94,12 @@ def center_console_on_mouse_monitor():
         x = mon_x + (mon_w - win_w) // 2
         y = mon_y + (mon_h - win_h) // 2
         
+        # Already in place - skip the move
+        if (rect.left, rect.top) == (x, y):
+            return
+        
         # Move window (SWP_NOSIZE | SWP_NOZORDER)
-        user32.SetWindowPos(hwnd, 0, x, y, 0, 0, 0x0001 | 0x0004)
+        _user32.SetWindowPos(hwnd, None, x, y, 0, 0, 0x0001 | 0x0004)
         
     except Exception as e:
         print(f"Console position error: {e}")
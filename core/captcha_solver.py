@@ -3,22 +3,185 @@ DouyinStream Pro - CAPTCHA Solver
 Abre navegador para que usuario resuelva CAPTCHA manualmente.
 """
 
+import atexit
+import json
 import logging
+import os
+import threading
 import time
-from typing import Optional, Dict
+from typing import Optional, Dict, Tuple
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
 
+from config.settings_manager import get_settings
+
+
+# Sondeo del estado de la página: el navegador serializa el DOM y solo
+# devuelve el tamaño y las marcas que mira _wait_for_captcha_resolution
+_PAGE_PROBE_JS = """(() => {
+    const html = document.documentElement.outerHTML;
+    return {
+        size: html.length,
+        hasCaptcha: html.includes('TTGCaptcha'),
+        hasRoot: html.includes('<div id="root"'),
+        loading: html.includes('middle_page_loading'),
+    };
+})()"""
+
 
 class DouyinCaptchaSolver:
     """
     Resuelve CAPTCHA de Douyin abriendo navegador para interacción manual.
+    El navegador se crea en el primer CAPTCHA y se reutiliza en los siguientes;
+    shutdown() lo cierra.
     """
     
+    # URLs cuyas cookies se devuelven tras resolver el CAPTCHA
+    COOKIE_URLS = ["https://live.douyin.com", "https://www.douyin.com"]
+    IMPORTANT_COOKIES = frozenset({'ttwid', '__ac_nonce', 'sessionid', 'sid_guard'})
+    
+    # Rutas de driver ya resueltas por webdriver-manager (evita su consulta HTTP).
+    # Se guardan también en data/driver_paths.json y valen DRIVER_CACHE_TTL_SEC.
+    _driver_paths: Dict[str, str] = {}
+    DRIVER_CACHE_TTL_SEC = 7 * 24 * 3600
+    
     def __init__(self):
         self.driver = None
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _driver_cache_path():
+        """Ubicación de la caché en disco de rutas de driver."""
+        return get_settings().get_data_path() / "driver_paths.json"
+    
+    @classmethod
+    def _load_driver_cache(cls) -> Dict[str, str]:
+        """Rutas guardadas en disco si la caché no ha caducado."""
+        cache_path = cls._driver_cache_path()
+        try:
+            if cache_path.stat().st_mtime < time.time() - cls.DRIVER_CACHE_TTL_SEC:
+                return {}
+            paths = json.loads(cache_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {}
+        return paths if isinstance(paths, dict) else {}
+    
+    @classmethod
+    def _save_driver_cache(cls, paths: Dict[str, str]) -> None:
+        """Guarda las rutas de forma atómica (archivo temporal + rename)."""
+        cache_path = cls._driver_cache_path()
+        tmp_path = cache_path.with_suffix(".json.tmp")
+        try:
+            tmp_path.write_text(json.dumps(paths), encoding='utf-8')
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass
+    
+    @classmethod
+    def _driver_path(cls, browser: str, manager_factory, refresh: bool = False) -> Tuple[str, bool]:
+        """
+        Ruta del driver para browser y si venía de caché.
+        Solo se instala (con consulta de red) si no hay ruta válida o refresh=True.
+        """
+        if not refresh:
+            path = cls._driver_paths.get(browser)
+            if path is None:
+                path = cls._load_driver_cache().get(browser)
+            if path and os.path.isfile(path):
+                cls._driver_paths[browser] = path
+                return path, True
+        
+        path = cls._driver_paths[browser] = manager_factory().install()
+        paths = cls._load_driver_cache()
+        paths[browser] = path
+        cls._save_driver_cache(paths)
+        return path, False
+    
+    def _launch(self, browser: str, manager_factory, start) -> None:
+        """
+        Abre el navegador con start(ruta_driver). Si falla con una ruta cacheada
+        (p. ej. el navegador se actualizó y el driver quedó desfasado),
+        reinstala el driver y reintenta una vez.
+        """
+        path, cached = self._driver_path(browser, manager_factory)
+        try:
+            self.driver = start(path)
+        except Exception:
+            if not cached:
+                raise
+            logging.info(f"[CaptchaSolver] Driver en caché no válido, reinstalando ({browser})...")
+            path, _ = self._driver_path(browser, manager_factory, refresh=True)
+            self.driver = start(path)
+    
+    def _driver_alive(self) -> bool:
+        """True si el navegador sigue abierto (el usuario puede haberlo cerrado)."""
+        if self.driver is None:
+            return False
+        try:
+            self.driver.current_url
+            return True
+        except Exception:
+            self.shutdown()
+            return False
+    
+    def _create_driver(self) -> None:
+        """Abre Chrome o, si no está disponible, Edge."""
+        # Intentar Chrome primero, luego Edge
+        try:
+            logging.info("[CaptchaSolver] Intentando abrir Chrome...")
+            chrome_options = Options()
+            chrome_options.add_argument('--start-maximized')
+            chrome_options.add_argument('--disable-blink-features=AutomationControlled')
+            chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+            chrome_options.add_experimental_option('useAutomationExtension', False)
+            
+            self._launch(
+                'chrome', ChromeDriverManager,
+                lambda path: webdriver.Chrome(service=Service(path), options=chrome_options),
+            )
+            logging.info("[CaptchaSolver] Chrome abierto exitosamente")
+            
+        except Exception as chrome_error:
+            logging.warning(f"[CaptchaSolver] Chrome no disponible: {str(chrome_error)[:100]}")
+            logging.info("[CaptchaSolver] Intentando abrir Edge...")
+            
+            try:
+                from selenium.webdriver.edge.service import Service as EdgeService
+                from selenium.webdriver.edge.options import Options as EdgeOptions
+                from webdriver_manager.microsoft import EdgeChromiumDriverManager
+                
+                edge_options = EdgeOptions()
+                edge_options.add_argument('--start-maximized')
+                edge_options.add_argument('--disable-blink-features=AutomationControlled')
+                edge_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+                
+                # Especificar ruta de Edge en Windows
+                edge_paths = [
+                    r"C:\Program Files (x86)\Microsoft\Edge\Application\msedge.exe",
+                    r"C:\Program Files\Microsoft\Edge\Application\msedge.exe",
+                ]
+                
+                edge_binary = None
+                for path in edge_paths:
+                    if os.path.exists(path):
+                        edge_binary = path
+                        break
+                
+                if edge_binary:
+                    edge_options.binary_location = edge_binary
+                    logging.info(f"[CaptchaSolver] Edge encontrado en: {edge_binary}")
+                
+                self._launch(
+                    'edge', EdgeChromiumDriverManager,
+                    lambda path: webdriver.Edge(service=EdgeService(path), options=edge_options),
+                )
+                logging.info("[CaptchaSolver] Edge abierto exitosamente")
+                
+            except Exception as edge_error:
+                logging.error(f"[CaptchaSolver] Edge tampoco disponible: {str(edge_error)[:100]}")
+                raise Exception("No se pudo abrir Chrome ni Edge. Instala Chrome o verifica que Edge este instalado.")
     
     def solve_captcha(self, url: str, timeout: int = 300) -> Dict[str, str]:
         """
@@ -35,68 +198,20 @@ class DouyinCaptchaSolver:
             TimeoutError: Si el CAPTCHA no se resuelve en el tiempo límite
             Exception: Si hay error al abrir navegador o extraer cookies
         """
+        with self._lock:
+            return self._solve_captcha(url, timeout)
+    
+    def _solve_captcha(self, url: str, timeout: int) -> Dict[str, str]:
+        """Cuerpo de solve_captcha; se ejecuta con self._lock tomado."""
         try:
             logging.info("[CaptchaSolver] Iniciando resolución de CAPTCHA...")
             
-            # Intentar Chrome primero, luego Edge
-            driver_created = False
-            
-            # Intentar Chrome
-            try:
-                logging.info("[CaptchaSolver] Intentando abrir Chrome...")
-                chrome_options = Options()
-                chrome_options.add_argument('--start-maximized')
-                chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-                chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-                chrome_options.add_experimental_option('useAutomationExtension', False)
-                
-                service = Service(ChromeDriverManager().install())
-                self.driver = webdriver.Chrome(service=service, options=chrome_options)
-                driver_created = True
-                logging.info("[CaptchaSolver] Chrome abierto exitosamente")
-                
-            except Exception as chrome_error:
-                logging.warning(f"[CaptchaSolver] Chrome no disponible: {str(chrome_error)[:100]}")
-                logging.info("[CaptchaSolver] Intentando abrir Edge...")
-                
-                try:
-                    from selenium.webdriver.edge.service import Service as EdgeService
-                    from selenium.webdriver.edge.options import Options as EdgeOptions
-                    from webdriver_manager.microsoft import EdgeChromiumDriverManager
-                    
-                    edge_options = EdgeOptions()
-                    edge_options.add_argument('--start-maximized')
-                    edge_options.add_argument('--disable-blink-features=AutomationControlled')
-                    edge_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-                    
-                    # Especificar ruta de Edge en Windows
-                    import os
-                    edge_paths = [
-                        r"C:\Program Files (x86)\Microsoft\Edge\Application\msedge.exe",
-                        r"C:\Program Files\Microsoft\Edge\Application\msedge.exe",
-                    ]
-                    
-                    edge_binary = None
-                    for path in edge_paths:
-                        if os.path.exists(path):
-                            edge_binary = path
-                            break
-                    
-                    if edge_binary:
-                        edge_options.binary_location = edge_binary
-                        logging.info(f"[CaptchaSolver] Edge encontrado en: {edge_binary}")
-                    
-                    edge_service = EdgeService(EdgeChromiumDriverManager().install())
-                    self.driver = webdriver.Edge(service=edge_service, options=edge_options)
-                    driver_created = True
-                    logging.info("[CaptchaSolver] Edge abierto exitosamente")
-                    
-                except Exception as edge_error:
-                    logging.error(f"[CaptchaSolver] Edge tampoco disponible: {str(edge_error)[:100]}")
-                    raise Exception("No se pudo abrir Chrome ni Edge. Instala Chrome o verifica que Edge este instalado.")
-            
-            if not driver_created:
-                raise Exception("No se pudo crear el navegador")
+            if self._driver_alive():
+                # Navegador de un CAPTCHA anterior: volver a mostrarlo
+                logging.info("[CaptchaSolver] Reutilizando navegador abierto")
+                self.driver.maximize_window()
+            else:
+                self._create_driver()
             
             logging.info(f"[CaptchaSolver] Navegador abierto, cargando: {url}")
             
@@ -104,7 +219,7 @@ class DouyinCaptchaSolver:
             self.driver.get(url)
             
             logging.info("[CaptchaSolver] Por favor resuelve el CAPTCHA en el navegador...")
-            logging.info("[CaptchaSolver] El navegador se cerrará automáticamente cuando termines")
+            logging.info("[CaptchaSolver] El navegador se minimizará automáticamente cuando termines")
             
             # Esperar resolución
             self._wait_for_captcha_resolution(timeout)
@@ -121,13 +236,24 @@ class DouyinCaptchaSolver:
             raise
             
         finally:
-            # Cerrar navegador
+            # Dejar el navegador en blanco y minimizado para el próximo CAPTCHA.
+            # Sus cookies se conservan: una sesión verificada evita nuevos retos.
             if self.driver:
                 try:
-                    self.driver.quit()
-                    logging.info("[CaptchaSolver] Navegador cerrado")
-                except:
-                    pass
+                    self.driver.get('about:blank')
+                    self.driver.minimize_window()
+                except Exception:
+                    self.shutdown()
+    
+    def shutdown(self) -> None:
+        """Cierra el navegador si está abierto."""
+        if self.driver:
+            try:
+                self.driver.quit()
+                logging.info("[CaptchaSolver] Navegador cerrado")
+            except Exception:
+                pass
+            self.driver = None
     
     def _wait_for_captcha_resolution(self, timeout: int) -> None:
         """
@@ -142,9 +268,9 @@ class DouyinCaptchaSolver:
         
         while time.time() - start_time < timeout:
             try:
-                # Obtener HTML actual
-                html = self.driver.page_source
-                html_size = len(html)
+                # Estado actual de la página (sin transferir el HTML completo)
+                probe = self._probe_page()
+                html_size = probe['size']
                 
                 # Log cada 10 segundos
                 current_time = time.time()
@@ -161,13 +287,13 @@ class DouyinCaptchaSolver:
                     return
                 
                 # Método 2: Ya no hay script de CAPTCHA
-                if 'TTGCaptcha' not in html and html_size > 10000:
+                if not probe['hasCaptcha'] and html_size > 10000:
                     logging.info("[CaptchaSolver] ✓ CAPTCHA resuelto! (Script de CAPTCHA desapareció)")
                     time.sleep(2)
                     return
                 
                 # Método 3: Detectar elementos de contenido real
-                if '<div id="root"' in html and 'middle_page_loading' not in html:
+                if probe['hasRoot'] and not probe['loading']:
                     logging.info("[CaptchaSolver] ✓ CAPTCHA resuelto! (Contenido real detectado)")
                     time.sleep(2)
                     return
@@ -180,6 +306,14 @@ class DouyinCaptchaSolver:
         
         raise TimeoutError(f"CAPTCHA no resuelto en {timeout} segundos")
     
+    def _probe_page(self) -> Dict[str, object]:
+        """Evalúa _PAGE_PROBE_JS vía CDP y devuelve su resultado."""
+        response = self.driver.execute_cdp_cmd(
+            "Runtime.evaluate",
+            {"expression": _PAGE_PROBE_JS, "returnByValue": True},
+        )
+        return response['result']['value']
+    
     def _extract_cookies(self) -> Dict[str, str]:
         """
         Extrae cookies del navegador.
@@ -190,12 +324,12 @@ class DouyinCaptchaSolver:
         cookies = {}
         
         try:
-            for cookie in self.driver.get_cookies():
-                cookies[cookie['name']] = cookie['value']
+            # Solo las cookies de Douyin, filtradas en el navegador vía CDP
+            response = self.driver.execute_cdp_cmd("Network.getCookies", {"urls": self.COOKIE_URLS})
+            cookies = {cookie['name']: cookie['value'] for cookie in response['cookies']}
             
             # Log cookies importantes
-            important_cookies = ['ttwid', '__ac_nonce', 'sessionid', 'sid_guard']
-            found_important = [name for name in important_cookies if name in cookies]
+            found_important = sorted(self.IMPORTANT_COOKIES & cookies.keys())
             
             if found_important:
                 logging.info(f"[CaptchaSolver] Cookies importantes encontradas: {found_important}")
@@ -206,9 +340,24 @@ class DouyinCaptchaSolver:
         return cookies
 
 
+# Solver compartido por todo el proceso (un solo navegador)
+_solver: Optional[DouyinCaptchaSolver] = None
+_solver_lock = threading.Lock()
+
+
+def get_captcha_solver() -> DouyinCaptchaSolver:
+    """Devuelve el solver compartido; su navegador se cierra al salir."""
+    global _solver
+    with _solver_lock:
+        if _solver is None:
+            _solver = DouyinCaptchaSolver()
+            atexit.register(_solver.shutdown)
+        return _solver
+
+
 def test_captcha_solver():
     """Función de prueba para el solver."""
-    solver = DouyinCaptchaSolver()
+    solver = get_captcha_solver()
     
     try:
         cookies = solver.solve_captcha('https://live.douyin.com/198671092027')
@@ -231,6 +380,6 @@ if __name__ == "__main__":
     print("TEST: CAPTCHA Solver")
     print("="*70)
     print("\nSe abrirá Chrome. Por favor resuelve el CAPTCHA.")
-    print("El navegador se cerrará automáticamente cuando termines.\n")
+    print("El navegador se minimizará automáticamente cuando termines.\n")
     
     test_captcha_solver()
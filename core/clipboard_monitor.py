@@ -3,11 +3,11 @@ DouyinStream Pro - Clipboard Monitor
 Smart clipboard listener for automatic URL detection.
 """
 
+import ctypes
+import ctypes.wintypes
 import re
 import threading
-import time
 from typing import Callable, Optional
-import hashlib
 
 try:
     import pyperclip
@@ -15,6 +15,113 @@ try:
 except ImportError:
     PYPERCLIP_AVAILABLE = False
 
+try:
+    # Linear-time DFA engine for the URL alternation (google-re2, optional)
+    import re2
+    RE2_AVAILABLE = True
+except ImportError:
+    RE2_AVAILABLE = False
+
+
+# Win32 clipboard change notifications (AddClipboardFormatListener).
+# The listener window is message-only; its window procedure routes
+# WM_CLIPBOARDUPDATE to the ClipboardMonitor that owns the hwnd.
+WM_QUIT = 0x0012
+WM_CLIPBOARDUPDATE = 0x031D
+HWND_MESSAGE = -3
+_LISTENER_CLASS_NAME = "DouyinStreamClipboardListener"
+
+_listeners: dict[int, "ClipboardMonitor"] = {}
+_listener_class_lock = threading.Lock()
+_listener_class_registered = False
+
+try:
+    _user32 = ctypes.WinDLL("user32", use_last_error=True)
+    _kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    
+    _WNDPROC = ctypes.WINFUNCTYPE(
+        ctypes.wintypes.LPARAM,   # LRESULT
+        ctypes.wintypes.HWND,
+        ctypes.wintypes.UINT,
+        ctypes.wintypes.WPARAM,
+        ctypes.wintypes.LPARAM,
+    )
+    
+    class _WNDCLASSW(ctypes.Structure):
+        _fields_ = [
+            ("style", ctypes.wintypes.UINT),
+            ("lpfnWndProc", _WNDPROC),
+            ("cbClsExtra", ctypes.c_int),
+            ("cbWndExtra", ctypes.c_int),
+            ("hInstance", ctypes.wintypes.HINSTANCE),
+            ("hIcon", ctypes.wintypes.HICON),
+            ("hCursor", ctypes.wintypes.HANDLE),
+            ("hbrBackground", ctypes.wintypes.HBRUSH),
+            ("lpszMenuName", ctypes.wintypes.LPCWSTR),
+            ("lpszClassName", ctypes.wintypes.LPCWSTR),
+        ]
+    
+    _user32.DefWindowProcW.argtypes = [
+        ctypes.wintypes.HWND, ctypes.wintypes.UINT, ctypes.wintypes.WPARAM, ctypes.wintypes.LPARAM
+    ]
+    _user32.DefWindowProcW.restype = ctypes.wintypes.LPARAM
+    _user32.RegisterClassW.argtypes = [ctypes.POINTER(_WNDCLASSW)]
+    _user32.RegisterClassW.restype = ctypes.wintypes.ATOM
+    _user32.CreateWindowExW.argtypes = [
+        ctypes.wintypes.DWORD, ctypes.wintypes.LPCWSTR, ctypes.wintypes.LPCWSTR, ctypes.wintypes.DWORD,
+        ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+        ctypes.wintypes.HWND, ctypes.wintypes.HMENU, ctypes.wintypes.HINSTANCE, ctypes.wintypes.LPVOID,
+    ]
+    _user32.CreateWindowExW.restype = ctypes.wintypes.HWND
+    _user32.DestroyWindow.argtypes = [ctypes.wintypes.HWND]
+    _user32.DestroyWindow.restype = ctypes.wintypes.BOOL
+    _user32.AddClipboardFormatListener.argtypes = [ctypes.wintypes.HWND]
+    _user32.AddClipboardFormatListener.restype = ctypes.wintypes.BOOL
+    _user32.RemoveClipboardFormatListener.argtypes = [ctypes.wintypes.HWND]
+    _user32.RemoveClipboardFormatListener.restype = ctypes.wintypes.BOOL
+    _user32.GetMessageW.argtypes = [
+        ctypes.POINTER(ctypes.wintypes.MSG), ctypes.wintypes.HWND, ctypes.wintypes.UINT, ctypes.wintypes.UINT
+    ]
+    _user32.GetMessageW.restype = ctypes.wintypes.BOOL
+    _user32.TranslateMessage.argtypes = [ctypes.POINTER(ctypes.wintypes.MSG)]
+    _user32.DispatchMessageW.argtypes = [ctypes.POINTER(ctypes.wintypes.MSG)]
+    _user32.DispatchMessageW.restype = ctypes.wintypes.LPARAM
+    _user32.PostThreadMessageW.argtypes = [
+        ctypes.wintypes.DWORD, ctypes.wintypes.UINT, ctypes.wintypes.WPARAM, ctypes.wintypes.LPARAM
+    ]
+    _user32.PostThreadMessageW.restype = ctypes.wintypes.BOOL
+    _kernel32.GetModuleHandleW.argtypes = [ctypes.wintypes.LPCWSTR]
+    _kernel32.GetModuleHandleW.restype = ctypes.wintypes.HMODULE
+    _kernel32.GetCurrentThreadId.restype = ctypes.wintypes.DWORD
+    
+    def _listener_wnd_proc(hwnd, msg, wparam, lparam):
+        if msg == WM_CLIPBOARDUPDATE:
+            monitor = _listeners.get(hwnd)
+            if monitor is not None:
+                monitor._check_clipboard()
+            return 0
+        return _user32.DefWindowProcW(hwnd, msg, wparam, lparam)
+    
+    # Module-level reference keeps the C thunk alive for the class lifetime
+    _LISTENER_WNDPROC = _WNDPROC(_listener_wnd_proc)
+    CLIPBOARD_LISTENER_AVAILABLE = True
+except (AttributeError, OSError):
+    # Not on Windows - ClipboardMonitor falls back to polling
+    CLIPBOARD_LISTENER_AVAILABLE = False
+
+
+def _register_listener_class() -> bool:
+    """Register the listener window class once per process."""
+    global _listener_class_registered
+    with _listener_class_lock:
+        if not _listener_class_registered:
+            wc = _WNDCLASSW()
+            wc.lpfnWndProc = _LISTENER_WNDPROC
+            wc.hInstance = _kernel32.GetModuleHandleW(None)
+            wc.lpszClassName = _LISTENER_CLASS_NAME
+            _listener_class_registered = bool(_user32.RegisterClassW(ctypes.byref(wc)))
+        return _listener_class_registered
+
 
 class ClipboardMonitor:
     """
@@ -58,58 +165,154 @@ class ClipboardMonitor:
         r'https?://(?:www\.)?dailymotion\.com/video/\w+',
     ]
     
-    def __init__(self, check_interval: float = 0.5) -> None:
+    # All patterns compiled once into a single alternation (order preserved).
+    # Case-insensitivity is inline so the same pattern works with re and re2;
+    # both use leftmost-first alternation, so matches are identical.
+    _URL_RE = (re2 if RE2_AVAILABLE else re).compile(
+        '(?i)' + '|'.join(f'(?:{p})' for p in URL_PATTERNS)
+    )
+    
+    # Multiplier applied to the poll interval after each unchanged check
+    BACKOFF_FACTOR = 1.5
+    
+    def __init__(self, check_interval: float = 0.5, max_interval: float = 2.0) -> None:
         """
         Initialize clipboard monitor.
+        On Windows the monitor waits for clipboard change notifications;
+        the polling intervals only apply when that is unavailable.
         
         Args:
             check_interval: Seconds between clipboard checks (default 0.5s)
+            max_interval: Upper bound for the idle backoff interval (default 2.0s)
         """
         self._check_interval = check_interval
+        self._max_interval = max(max_interval, check_interval)
         self._running = False
         self._thread: Optional[threading.Thread] = None
-        self._last_hash: str = ""
+        self._stop_event = threading.Event()
+        self._listener_thread_id: Optional[int] = None
+        self._last_hash: Optional[int] = None
+        self._last_content: str = ""
         self._callbacks: list[Callable[[str], None]] = []
         self._enabled = True
     
-    def _hash_content(self, content: str) -> str:
-        """Generate hash of clipboard content to detect changes."""
-        return hashlib.md5(content.encode('utf-8', errors='ignore')).hexdigest()
+    def _hash_content(self, content: str) -> int:
+        """
+        Generate hash of clipboard content to detect changes.
+        Builtin str hash: no encode/hexdigest, only compared within this process.
+        """
+        return hash(content)
     
     def _is_valid_url(self, text: str) -> Optional[str]:
         """
         Check if text contains a valid Douyin/TikTok URL.
         Returns the URL if found, None otherwise.
         """
-        for pattern in self.URL_PATTERNS:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return match.group(0)
-        return None
+        # Every pattern needs a scheme separator; plain substring search is far
+        # cheaper than running the alternation over arbitrary pasted text
+        if '://' not in text:
+            return None
+        match = self._URL_RE.search(text)
+        return match.group(0) if match else None
+    
+    def _check_clipboard(self) -> bool:
+        """
+        Read the clipboard once and emit a URL if the content changed.
+        Returns True if the clipboard content changed.
+        """
+        if not (self._enabled and PYPERCLIP_AVAILABLE):
+            return False
+        
+        try:
+            content = pyperclip.paste()
+            # Unchanged clipboard: identity/length check in C, no hashing
+            if not content or content == self._last_content:
+                return False
+            self._last_content = content
+            current_hash = self._hash_content(content)
+            
+            # Only process if content changed
+            if current_hash != self._last_hash:
+                self._last_hash = current_hash
+                
+                # Check for valid URL
+                url = self._is_valid_url(content)
+                if url:
+                    self._emit_url_detected(url)
+            return True
+                    
+        except Exception:
+            # Silently ignore clipboard access errors
+            return False
     
     def _monitor_loop(self) -> None:
         """Main monitoring loop running in daemon thread."""
-        while self._running:
-            if self._enabled and PYPERCLIP_AVAILABLE:
-                try:
-                    content = pyperclip.paste()
-                    if content:
-                        current_hash = self._hash_content(content)
-                        
-                        # Only process if content changed
-                        if current_hash != self._last_hash:
-                            self._last_hash = current_hash
-                            
-                            # Check for valid URL
-                            url = self._is_valid_url(content)
-                            if url:
-                                self._emit_url_detected(url)
-                                
-                except Exception:
-                    # Silently ignore clipboard access errors
-                    pass
+        stop_event = self._stop_event
+        
+        if CLIPBOARD_LISTENER_AVAILABLE:
+            try:
+                if self._listen_loop(stop_event):
+                    return
+            except Exception as e:
+                print(f"[ClipboardMonitor] Clipboard listener failed, polling instead: {e}")
+        
+        self._poll_loop(stop_event)
+    
+    def _listen_loop(self, stop_event: threading.Event) -> bool:
+        """
+        Block on WM_CLIPBOARDUPDATE notifications instead of polling.
+        Returns False if the listener could not be set up.
+        """
+        if not _register_listener_class():
+            return False
+        
+        hwnd = _user32.CreateWindowExW(
+            0, _LISTENER_CLASS_NAME, None, 0, 0, 0, 0, 0,
+            HWND_MESSAGE, None, _kernel32.GetModuleHandleW(None), None
+        )
+        if not hwnd:
+            return False
+        
+        try:
+            _listeners[hwnd] = self
+            if not _user32.AddClipboardFormatListener(hwnd):
+                return False
             
-            time.sleep(self._check_interval)
+            # Published before the stop check so stop() can always wake us
+            self._listener_thread_id = _kernel32.GetCurrentThreadId()
+            
+            # Pick up whatever is already on the clipboard
+            self._check_clipboard()
+            
+            msg = ctypes.wintypes.MSG()
+            while self._running and not stop_event.is_set():
+                # Returns 0 on WM_QUIT (posted by stop()) and -1 on error
+                if _user32.GetMessageW(ctypes.byref(msg), None, 0, 0) in (0, -1):
+                    break
+                _user32.TranslateMessage(ctypes.byref(msg))
+                _user32.DispatchMessageW(ctypes.byref(msg))
+            return True
+        finally:
+            self._listener_thread_id = None
+            _user32.RemoveClipboardFormatListener(hwnd)
+            _listeners.pop(hwnd, None)
+            _user32.DestroyWindow(hwnd)
+    
+    def _poll_loop(self, stop_event: threading.Event) -> None:
+        """
+        Polling fallback for platforms without clipboard notifications.
+        Backs off exponentially while the clipboard is idle and snaps back
+        to the base interval as soon as its content changes.
+        """
+        interval = self._check_interval
+        while self._running and not stop_event.is_set():
+            changed = self._check_clipboard()
+            
+            if changed:
+                interval = self._check_interval
+            else:
+                interval = min(interval * self.BACKOFF_FACTOR, self._max_interval)
+            stop_event.wait(interval)
     
     def _emit_url_detected(self, url: str) -> None:
         """Notify all callbacks of detected URL."""
@@ -139,6 +342,7 @@ class ClipboardMonitor:
             return
         
         self._running = True
+        self._stop_event = threading.Event()
         self._thread = threading.Thread(target=self._monitor_loop, daemon=True)
         self._thread.start()
         print("[ClipboardMonitor] Monitor started")
@@ -146,6 +350,13 @@ class ClipboardMonitor:
     def stop(self) -> None:
         """Stop the clipboard monitor."""
         self._running = False
+        self._stop_event.set()
+        
+        # Wake a listener blocked in GetMessageW
+        thread_id = self._listener_thread_id
+        if thread_id:
+            _user32.PostThreadMessageW(thread_id, WM_QUIT, 0, 0)
+        
         if self._thread:
             self._thread.join(timeout=1.0)
             self._thread = None
@@ -169,4 +380,5 @@ class ClipboardMonitor:
     
     def clear_last_hash(self) -> None:
         """Clear last hash to re-detect current clipboard content."""
-        self._last_hash = ""
+        self._last_hash = None
+        self._last_content = ""
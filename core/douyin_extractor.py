@@ -54,7 +54,8 @@ class DouyinExtractor:
             # Fetch the page
             response = self.session.get(room_url, timeout=10)
             response.raise_for_status()
-            html = response.text
+            # Raw bytes: the extraction pipeline never needs a decoded page
+            html = response.content
             
             # Detectar CAPTCHA
             if self._is_captcha_page(html):
@@ -63,8 +64,8 @@ class DouyinExtractor:
                 
                 try:
                     # Resolver CAPTCHA
-                    from core.captcha_solver import DouyinCaptchaSolver
-                    solver = DouyinCaptchaSolver()
+                    from core.captcha_solver import get_captcha_solver
+                    solver = get_captcha_solver()
                     
                     cookies = solver.solve_captcha(room_url)
                     
@@ -77,7 +78,7 @@ class DouyinExtractor:
                     # Reintentar con cookies válidas
                     response = self.session.get(room_url, timeout=10)
                     response.raise_for_status()
-                    html = response.text
+                    html = response.content
                     
                 except Exception as e:
                     logging.error(f"[DouyinExtractor] Error resolviendo CAPTCHA: {e}")
@@ -106,17 +107,17 @@ class DouyinExtractor:
             logging.error(f"[DouyinExtractor] Error extracting stream: {e}")
             return None
     
-    def _is_captcha_page(self, html: str) -> bool:
+    def _is_captcha_page(self, html: bytes) -> bool:
         """
         Detecta si la página es de CAPTCHA.
         
         Args:
-            html: HTML de la página
+            html: HTML de la página (bytes crudos de la respuesta)
             
         Returns:
             True si es página de CAPTCHA, False si no
         """
-        return 'TTGCaptcha' in html and len(html) < 10000
+        return b'TTGCaptcha' in html and len(html) < 10000
     
     def _extract_render_data(self, html: str) -> Optional[dict]:
         """Extract stream data from RENDER_DATA variable."""
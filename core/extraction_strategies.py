@@ -7,10 +7,91 @@ import re
 import json
 import logging
 from abc import ABC, abstractmethod
-from typing import Optional, List, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, Tuple, Union
 from datetime import datetime
 import os
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+# Compiled once at import and shared by all strategies.
+# Patterns are bytes: pages are scanned as raw response bytes and only the
+# small captured groups are decoded.
+_STREAM_MARKER_RE = re.compile(rb'\.(?:flv|m3u8)["\']')
+_STREAM_URL_RE = re.compile(rb'"(?P<url>https?://[^"]+\.(?P<kind>flv|m3u8)[^"]*)"')
+_QUALITY_RE = re.compile(rb'_(sd|hd|uhd|origin|ld)\.')
+_META_RE = re.compile(rb'"(title|nickname)":"([^"]+)"')
+_PACE_RE = re.compile(rb'self\.__pace_f\.push\(\[(\d+),"(\w+:.+?)"\]\)</script>')
+
+
+# Page feature bits, computed once per extraction and shared by all can_extract checks
+FEATURE_STREAM_URL = 1 << 0    # quoted .flv/.m3u8 URL
+FEATURE_PACE_F = 1 << 1        # __pace_f hydration pushes
+FEATURE_STREAM_STORE = 1 << 2  # streamStore state key
+
+
+def _fingerprint(html: bytes) -> int:
+    """Scan the page once for every marker the strategies pre-check on."""
+    features = 0
+    if _STREAM_MARKER_RE.search(html):
+        features |= FEATURE_STREAM_URL
+    if b'__pace_f' in html:
+        features |= FEATURE_PACE_F
+        if b'streamStore' in html:
+            features |= FEATURE_STREAM_STORE
+    return features
+
+
+def _json_loads(data):
+    """Parse a JSON payload, using orjson for the large __pace_f blobs when available."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# Shared default for chained .get() lookups - never mutated
+_EMPTY: Dict = {}
+
+
+def _parse_state(state: dict) -> Optional[Dict]:
+    """
+    Build the stream info dict from a hydrated page ``state`` object.
+    
+    Returns None if the state has no FLV stream URLs.
+    """
+    stream = (state.get('streamStore', _EMPTY)
+                   .get('streamData', _EMPTY)
+                   .get('H264_streamData', _EMPTY)
+                   .get('stream'))
+    if not stream:
+        return None
+    
+    qualities = {}
+    for quality_name, quality_data in stream.items():
+        if isinstance(quality_data, dict):
+            flv_url = quality_data.get('main', _EMPTY).get('flv')
+            if flv_url:
+                qualities[quality_name] = flv_url
+    
+    if not qualities:
+        return None
+    
+    room_info = state.get('roomStore', _EMPTY).get('roomInfo', _EMPTY)
+    room = room_info.get('room', _EMPTY)
+    
+    return {
+        'url': next(iter(qualities.values())),  # First quality listed is the best
+        'title': room.get('title', 'Douyin Live'),
+        'author': room_info.get('anchor', _EMPTY).get('nickname', 'Unknown'),
+        'is_live': room.get('status', 0) == 2,
+        'qualities': qualities
+    }
+
 
 class ExtractionStrategy(ABC):
     """Base class for extraction strategies."""
@@ -22,12 +103,18 @@ class ExtractionStrategy(ABC):
         self.failure_count = 0
     
     @abstractmethod
-    def can_extract(self, html: str) -> bool:
-        """Check if this strategy can be applied to the HTML."""
+    def can_extract(self, html: bytes, features: Optional[int] = None) -> bool:
+        """
+        Check if this strategy can be applied to the HTML.
+        
+        Args:
+            html: Raw page HTML bytes
+            features: Precomputed _fingerprint(html) bits (computed if None)
+        """
         pass
     
     @abstractmethod
-    def extract(self, html: str, cookies: dict = None) -> Optional[Dict]:
+    def extract(self, html: bytes, cookies: dict = None) -> Optional[Dict]:
         """
         Extract stream data from HTML.
         
@@ -58,34 +145,39 @@ class DirectURLStrategy(ExtractionStrategy):
         super().__init__()
         self.priority = 1  # Highest priority
     
-    def can_extract(self, html: str) -> bool:
+    def can_extract(self, html: bytes, features: Optional[int] = None) -> bool:
         """Check if FLV or M3U8 URLs are present."""
-        return bool(re.search(r'\.flv["\']', html) or re.search(r'\.m3u8["\']', html))
+        if features is None:
+            features = _fingerprint(html)
+        return bool(features & FEATURE_STREAM_URL)
     
-    def extract(self, html: str, cookies: dict = None) -> Optional[Dict]:
+    def extract(self, html: bytes, cookies: dict = None) -> Optional[Dict]:
         """Extract URLs directly from HTML."""
         try:
-            # Find FLV URLs
-            flv_urls = re.findall(r'"(https?://[^"]+\.flv[^"]*)"', html)
-            
-            # Find M3U8 URLs
-            m3u8_urls = re.findall(r'"(https?://[^"]+\.m3u8[^"]*)"', html)
+            # Find FLV and M3U8 URLs in a single pass
+            flv_urls = []
+            m3u8_urls = []
+            for match in _STREAM_URL_RE.finditer(html):
+                if match['kind'] == b'flv':
+                    flv_urls.append(match['url'])
+                else:
+                    m3u8_urls.append(match['url'])
             
             if not flv_urls and not m3u8_urls:
                 self.log_failure("No URLs found")
                 return None
             
             # Prefer FLV over M3U8
-            best_url = flv_urls[0] if flv_urls else m3u8_urls[0]
+            best_url = (flv_urls[0] if flv_urls else m3u8_urls[0]).decode('utf-8', 'replace')
             
             # Extract quality variants
             qualities = {}
             for url in (flv_urls + m3u8_urls)[:10]:
-                quality_match = re.search(r'_(sd|hd|uhd|origin|ld)\.', url)
+                quality_match = _QUALITY_RE.search(url)
                 if quality_match:
-                    quality = quality_match.group(1)
+                    quality = quality_match.group(1).decode('ascii')
                     if quality not in qualities:
-                        qualities[quality] = url
+                        qualities[quality] = url.decode('utf-8', 'replace')
             
             if not qualities:
                 qualities['best'] = best_url
@@ -94,13 +186,16 @@ class DirectURLStrategy(ExtractionStrategy):
             title = "Douyin Live"
             author = "Unknown"
             
-            title_match = re.search(r'"title":"([^"]+)"', html)
-            if title_match:
-                title = title_match.group(1)
-            
-            author_match = re.search(r'"nickname":"([^"]+)"', html)
-            if author_match:
-                author = author_match.group(1)
+            # First "title" and first "nickname" in one scan
+            meta = {}
+            for match in _META_RE.finditer(html):
+                meta.setdefault(match.group(1), match.group(2))
+                if len(meta) == 2:
+                    break
+            if b'title' in meta:
+                title = meta[b'title'].decode('utf-8', 'replace')
+            if b'nickname' in meta:
+                author = meta[b'nickname'].decode('utf-8', 'replace')
             
             self.log_success()
             
@@ -127,18 +222,19 @@ class JSONWrapperStrategy(ExtractionStrategy):
         super().__init__()
         self.priority = 2
     
-    def can_extract(self, html: str) -> bool:
+    def can_extract(self, html: bytes, features: Optional[int] = None) -> bool:
         """Check if __pace_f with streamStore is present."""
-        return bool(re.search(r'__pace_f.*streamStore', html))
+        if features is None:
+            features = _fingerprint(html)
+        return bool(features & FEATURE_STREAM_STORE)
     
-    def extract(self, html: str, cookies: dict = None) -> Optional[Dict]:
+    def extract(self, html: bytes, cookies: dict = None) -> Optional[Dict]:
         """Extract from JSON with wrapper."""
         try:
             # Find __pace_f.push calls with streamStore
-            pattern = re.compile(r'self\.__pace_f\.push\(\[(\d+),"(\w+:.+?)"\]\)</script>')
-            matches = pattern.findall(html)
+            matches = _PACE_RE.findall(html)
             
-            stream_matches = [m for m in matches if 'streamStore' in m[1]]
+            stream_matches = [m for m in matches if b'streamStore' in m[1]]
             
             if not stream_matches:
                 self.log_failure("No streamStore found")
@@ -146,14 +242,15 @@ class JSONWrapperStrategy(ExtractionStrategy):
             
             data_str = stream_matches[0][1]
             
-            # Remove prefix (e.g., "d:")
-            data_str = re.sub(r'^\w+:', '', data_str)
+            # Remove prefix (e.g., "d:") - _PACE_RE guarantees a leading \w+: so
+            # the first colon always ends it
+            data_str = data_str.partition(b':')[2]
             
-            # Unescape quotes
-            data_str = data_str.replace('\\"', '"')
+            # Unescape quotes - both JSON parsers accept UTF-8 bytes directly
+            data_str = data_str.replace(b'\\"', b'"')
             
             # Parse JSON
-            data = json.loads(data_str)
+            data = _json_loads(data_str)
             
             # Handle wrapper format: ["$", "$L12", null, {...}]
             state = None
@@ -167,53 +264,13 @@ class JSONWrapperStrategy(ExtractionStrategy):
                 self.log_failure("No state found in JSON")
                 return None
             
-            # Extract room info
-            room_store = state.get('roomStore', {})
-            room_info = room_store.get('roomInfo', {})
-            room = room_info.get('room', {})
-            anchor = room_info.get('anchor', {})
-            
-            title = room.get('title', 'Douyin Live')
-            author = anchor.get('nickname', 'Unknown')
-            status = room.get('status', 0)
-            is_live = (status == 2)
-            
-            # Extract stream URLs
-            stream_store = state.get('streamStore', {})
-            stream_data = stream_store.get('streamData', {})
-            h264_data = stream_data.get('H264_streamData', {})
-            stream = h264_data.get('stream', {})
-            
-            if not stream:
-                self.log_failure("No stream data")
-                return None
-            
-            qualities = {}
-            best_url = None
-            
-            for quality_name, quality_data in stream.items():
-                if isinstance(quality_data, dict):
-                    main_data = quality_data.get('main', {})
-                    flv_url = main_data.get('flv', '')
-                    
-                    if flv_url:
-                        qualities[quality_name] = flv_url
-                        if not best_url:
-                            best_url = flv_url
-            
-            if not best_url:
+            result = _parse_state(state)
+            if not result:
                 self.log_failure("No URLs in stream data")
                 return None
             
             self.log_success()
-            
-            return {
-                'url': best_url,
-                'title': title,
-                'author': author,
-                'is_live': is_live,
-                'qualities': qualities
-            }
+            return result
             
         except Exception as e:
             self.log_failure(str(e))
@@ -230,27 +287,28 @@ class LegacyJSONStrategy(ExtractionStrategy):
         super().__init__()
         self.priority = 3  # Lowest priority
     
-    def can_extract(self, html: str) -> bool:
+    def can_extract(self, html: bytes, features: Optional[int] = None) -> bool:
         """Check if __pace_f is present."""
-        return bool(re.search(r'__pace_f', html))
+        if features is None:
+            features = _fingerprint(html)
+        return bool(features & FEATURE_PACE_F)
     
-    def extract(self, html: str, cookies: dict = None) -> Optional[Dict]:
+    def extract(self, html: bytes, cookies: dict = None) -> Optional[Dict]:
         """Extract from legacy JSON format (no wrapper)."""
         try:
-            pattern = re.compile(r'self\.__pace_f\.push\(\[(\d+),"(\w+:.+?)"\]\)</script>')
-            matches = pattern.findall(html)
+            matches = _PACE_RE.findall(html)
             
-            stream_matches = [m for m in matches if 'streamStore' in m[1]]
+            stream_matches = [m for m in matches if b'streamStore' in m[1]]
             
             if not stream_matches:
                 self.log_failure("No streamStore found")
                 return None
             
             data_str = stream_matches[0][1]
-            data_str = re.sub(r'^\w+:', '', data_str)
+            data_str = data_str.partition(b':')[2]  # Strip "d:" prefix
             
             # Try direct parse (no wrapper)
-            data = json.loads(data_str)
+            data = _json_loads(data_str)
             
             # Expect direct array format
             if not isinstance(data, list):
@@ -259,39 +317,12 @@ class LegacyJSONStrategy(ExtractionStrategy):
             
             for item in data:
                 if isinstance(item, dict) and 'state' in item:
-                    # Same extraction logic as JSONWrapperStrategy
-                    state = item['state']
-                    
-                    room_store = state.get('roomStore', {})
-                    room_info = room_store.get('roomInfo', {})
-                    room = room_info.get('room', {})
-                    
-                    stream_store = state.get('streamStore', {})
-                    stream_data = stream_store.get('streamData', {})
-                    h264_data = stream_data.get('H264_streamData', {})
-                    stream = h264_data.get('stream', {})
-                    
-                    if stream:
-                        best_url = None
-                        qualities = {}
-                        
-                        for quality_name, quality_data in stream.items():
-                            if isinstance(quality_data, dict):
-                                flv_url = quality_data.get('main', {}).get('flv', '')
-                                if flv_url:
-                                    qualities[quality_name] = flv_url
-                                    if not best_url:
-                                        best_url = flv_url
-                        
-                        if best_url:
-                            self.log_success()
-                            return {
-                                'url': best_url,
-                                'title': room.get('title', 'Douyin Live'),
-                                'author': room_info.get('anchor', {}).get('nickname', 'Unknown'),
-                                'is_live': True,
-                                'qualities': qualities
-                            }
+                    result = _parse_state(item['state'])
+                    if result:
+                        # Legacy pages carry no reliable room status
+                        result['is_live'] = True
+                        self.log_success()
+                        return result
             
             self.log_failure("No valid data found")
             return None
@@ -316,6 +347,7 @@ class AdaptiveExtractor:
         
         # Sort by priority
         self.strategies.sort(key=lambda s: s.priority)
+        self.strategies_by_name: Dict[str, ExtractionStrategy] = {s.name: s for s in self.strategies}
         
         self.last_working_strategy: Optional[str] = None
         self.cache_file = os.path.join(os.path.dirname(__file__), '.strategy_cache.json')
@@ -325,68 +357,113 @@ class AdaptiveExtractor:
     def _load_cache(self):
         """Load cached strategy info."""
         try:
-            if os.path.exists(self.cache_file):
-                with open(self.cache_file, 'r') as f:
-                    cache = json.load(f)
-                    self.last_working_strategy = cache.get('last_working_strategy')
-                    logging.debug(f"[AdaptiveExtractor] Loaded cache: {self.last_working_strategy}")
+            with open(self.cache_file, 'r') as f:
+                cache = json.loads(f.read())
+            self.last_working_strategy = cache.get('last_working_strategy')
+            logging.debug(f"[AdaptiveExtractor] Loaded cache: {self.last_working_strategy}")
+        except FileNotFoundError:
+            pass
         except Exception as e:
             logging.debug(f"[AdaptiveExtractor] Cache load failed: {e}")
     
     def _save_cache(self, strategy_name: str):
-        """Save successful strategy to cache."""
+        """Save successful strategy to cache (single write + atomic rename)."""
         try:
-            cache = {
+            cache = json.dumps({
                 'last_working_strategy': strategy_name,
                 'last_success': datetime.now().isoformat(),
-            }
-            with open(self.cache_file, 'w') as f:
-                json.dump(cache, f)
+            })
+            tmp_file = self.cache_file + '.tmp'
+            with open(tmp_file, 'w') as f:
+                f.write(cache)
+            os.replace(tmp_file, self.cache_file)
             logging.debug(f"[AdaptiveExtractor] Saved cache: {strategy_name}")
         except Exception as e:
             logging.debug(f"[AdaptiveExtractor] Cache save failed: {e}")
     
-    def extract(self, html: str, cookies: dict = None) -> Optional[Dict]:
+    def extract(self, html: Union[bytes, str], cookies: dict = None) -> Optional[Dict]:
         """
         Try strategies in order until one succeeds.
         Prioritizes last working strategy.
+        
+        Args:
+            html: Raw response bytes (response.content); str is encoded as UTF-8
+            cookies: Optional cookies forwarded to strategies
         """
         logging.info("[AdaptiveExtractor] Starting extraction...")
         
+        if isinstance(html, str):
+            html = html.encode('utf-8')
+        
+        # One scan of the page feeds every strategy's pre-check
+        features = _fingerprint(html)
+        
         # Try last working strategy first
-        if self.last_working_strategy:
-            for strategy in self.strategies:
-                if strategy.name == self.last_working_strategy:
-                    logging.info(f"[AdaptiveExtractor] Trying cached strategy: {strategy.name}")
-                    if strategy.can_extract(html):
-                        result = strategy.extract(html, cookies)
-                        if result:
-                            logging.info(f"[AdaptiveExtractor] ✓ Cached strategy worked!")
-                            return result
-                    break
+        cached = self.strategies_by_name.get(self.last_working_strategy)
+        if cached:
+            logging.info(f"[AdaptiveExtractor] Trying cached strategy: {cached.name}")
+            if cached.can_extract(html, features):
+                result = cached.extract(html, cookies)
+                if result:
+                    logging.info(f"[AdaptiveExtractor] ✓ Cached strategy worked!")
+                    return result
         
-        # Try all strategies in priority order
+        # Pre-check the remaining strategies (priority order is preserved)
+        candidates = []
         for strategy in self.strategies:
-            if strategy.name == self.last_working_strategy:
+            if strategy is cached:
                 continue  # Already tried
             
-            logging.info(f"[AdaptiveExtractor] Trying strategy: {strategy.name}")
-            
-            if not strategy.can_extract(html):
+            if strategy.can_extract(html, features):
+                candidates.append(strategy)
+            else:
                 logging.debug(f"[AdaptiveExtractor] {strategy.name} cannot extract (pre-check failed)")
-                continue
-            
-            result = strategy.extract(html, cookies)
-            
-            if result:
-                logging.info(f"[AdaptiveExtractor] ✓ Success with {strategy.name}!")
-                self.last_working_strategy = strategy.name
-                self._save_cache(strategy.name)
-                return result
+        
+        # Cold start: nothing known to work yet, so run candidates speculatively
+        if cached is None and len(candidates) > 1:
+            strategy, result = self._extract_speculative(candidates, html, cookies)
+        else:
+            strategy, result = self._extract_sequential(candidates, html, cookies)
+        
+        if result:
+            logging.info(f"[AdaptiveExtractor] ✓ Success with {strategy.name}!")
+            self.last_working_strategy = strategy.name
+            self._save_cache(strategy.name)
+            return result
         
         logging.error("[AdaptiveExtractor] All strategies failed")
         return None
     
+    def _extract_sequential(self, candidates: List[ExtractionStrategy], html: bytes,
+                            cookies: dict = None) -> Tuple[Optional[ExtractionStrategy], Optional[Dict]]:
+        """Try candidates one at a time; return the first (strategy, result) that works."""
+        for strategy in candidates:
+            logging.info(f"[AdaptiveExtractor] Trying strategy: {strategy.name}")
+            result = strategy.extract(html, cookies)
+            if result:
+                return strategy, result
+        return None, None
+    
+    def _extract_speculative(self, candidates: List[ExtractionStrategy], html: bytes,
+                             cookies: dict = None) -> Tuple[Optional[ExtractionStrategy], Optional[Dict]]:
+        """
+        Start all candidates at once so a failing strategy's cost overlaps
+        with the next one's. Results are still consumed in priority order,
+        so a lower-priority strategy finishing first never wins.
+        """
+        pool = ThreadPoolExecutor(max_workers=len(candidates), thread_name_prefix="extract")
+        try:
+            futures = [(strategy, pool.submit(strategy.extract, html, cookies)) for strategy in candidates]
+            for strategy, future in futures:
+                logging.info(f"[AdaptiveExtractor] Trying strategy: {strategy.name}")
+                result = future.result()
+                if result:
+                    return strategy, result
+            return None, None
+        finally:
+            # Don't wait for slower, lower-priority strategies once we have a winner
+            pool.shutdown(wait=False, cancel_futures=True)
+    
     def get_stats(self) -> Dict:
         """Get statistics for all strategies."""
         return {
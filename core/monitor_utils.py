@@ -1,5 +1,6 @@
 import ctypes
 import ctypes.wintypes
+import threading
 from typing import Tuple, List, Optional
 
 # Structs for ctypes
@@ -22,20 +23,103 @@ class MONITORINFO(ctypes.Structure):
         ("dwFlags", ctypes.wintypes.DWORD),
     ]
 
+_MI_SIZE = ctypes.sizeof(MONITORINFO)
+
+# Private user32 handle with prototypes declared once at import, so calls skip
+# per-call argument inference without affecting other modules' ctypes.windll use
+try:
+    _user32 = ctypes.WinDLL("user32")
+    
+    # Callback type for EnumDisplayMonitors
+    _MONITORENUMPROC = ctypes.WINFUNCTYPE(
+        ctypes.c_bool,
+        ctypes.c_void_p,  # hMonitor
+        ctypes.c_void_p,  # hdcMonitor
+        ctypes.POINTER(RECT),  # lprcMonitor
+        ctypes.wintypes.LPARAM  # dwData
+    )
+    
+    _user32.MonitorFromPoint.argtypes = [POINT, ctypes.wintypes.DWORD]
+    _user32.MonitorFromPoint.restype = ctypes.c_void_p
+    _user32.GetMonitorInfoW.argtypes = [ctypes.c_void_p, ctypes.POINTER(MONITORINFO)]
+    _user32.GetMonitorInfoW.restype = ctypes.wintypes.BOOL
+    _user32.EnumDisplayMonitors.argtypes = [
+        ctypes.c_void_p, ctypes.POINTER(RECT), _MONITORENUMPROC, ctypes.wintypes.LPARAM
+    ]
+    _user32.EnumDisplayMonitors.restype = ctypes.wintypes.BOOL
+    _user32.GetSystemMetrics.argtypes = [ctypes.c_int]
+    _user32.GetSystemMetrics.restype = ctypes.c_int
+    _user32.GetWindowRect.argtypes = [ctypes.wintypes.HWND, ctypes.POINTER(RECT)]
+    _user32.GetWindowRect.restype = ctypes.wintypes.BOOL
+    _user32.SetWindowPos.argtypes = [
+        ctypes.wintypes.HWND, ctypes.wintypes.HWND,
+        ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+        ctypes.wintypes.UINT,
+    ]
+    _user32.SetWindowPos.restype = ctypes.wintypes.BOOL
+except (AttributeError, OSError):
+    # Not on Windows - the functions below fall back to defaults
+    _user32 = None
+
+# GetSystemMetrics indices describing the monitor layout
+SM_XVIRTUALSCREEN = 76
+SM_YVIRTUALSCREEN = 77
+SM_CXVIRTUALSCREEN = 78
+SM_CYVIRTUALSCREEN = 79
+SM_CMONITORS = 80
+
+# Cached get_all_monitors() result, keyed by the layout it was computed for
+_monitor_cache: Optional[List[Tuple[int, int, int, int]]] = None
+_monitor_cache_key: Optional[Tuple[int, ...]] = None
+
+
+def _get_layout_key() -> Tuple[int, ...]:
+    """
+    Cheap fingerprint of the monitor layout (monitor count + virtual screen).
+    Five GetSystemMetrics calls instead of a full EnumDisplayMonitors walk.
+    WM_DISPLAYCHANGE is not delivered to message-only windows, so the
+    layout is re-checked here instead of being pushed to us.
+    """
+    return tuple(_user32.GetSystemMetrics(i) for i in (
+        SM_CMONITORS, SM_XVIRTUALSCREEN, SM_YVIRTUALSCREEN,
+        SM_CXVIRTUALSCREEN, SM_CYVIRTUALSCREEN,
+    ))
+
+
+# Per-thread POINT/MONITORINFO buffers, reused instead of allocated per call
+_buffers = threading.local()
+
+
+def _get_buffers() -> Tuple[POINT, MONITORINFO]:
+    """Return this thread's reusable (POINT, MONITORINFO) pair."""
+    try:
+        return _buffers.pt, _buffers.mi
+    except AttributeError:
+        _buffers.pt = POINT()
+        _buffers.mi = MONITORINFO()
+        return _buffers.pt, _buffers.mi
+
+
+def invalidate_monitor_cache() -> None:
+    """Force the next get_all_monitors() call to re-enumerate monitors."""
+    global _monitor_cache, _monitor_cache_key
+    _monitor_cache = None
+    _monitor_cache_key = None
+
 def get_monitor_at_point(x: int, y: int) -> Tuple[int, int, int, int]:
     """
     Get the monitor bounds (x, y, w, h) that contains the given point.
     Uses Windows native API for robust multi-monitor support.
     """
     try:
-        user32 = ctypes.windll.user32
+        user32 = _user32
         
         # MonitorFromPoint constants
         MONITOR_DEFAULTTONULL = 0
         MONITOR_DEFAULTTOPRIMARY = 1
         MONITOR_DEFAULTTONEAREST = 2
         
-        pt = POINT()
+        pt, mi = _get_buffers()
         pt.x = x
         pt.y = y
         
@@ -43,8 +127,7 @@ def get_monitor_at_point(x: int, y: int) -> Tuple[int, int, int, int]:
         hMonitor = user32.MonitorFromPoint(pt, MONITOR_DEFAULTTONEAREST)
         
         # Get monitor info
-        mi = MONITORINFO()
-        mi.cbSize = ctypes.sizeof(MONITORINFO)
+        mi.cbSize = _MI_SIZE
         user32.GetMonitorInfoW(hMonitor, ctypes.byref(mi))
         
         # Calculate dimensions
@@ -60,38 +143,48 @@ def get_all_monitors() -> List[Tuple[int, int, int, int]]:
     """
     Get bounds (x, y, w, h) for all connected monitors.
     Uses Windows EnumDisplayMonitors API.
+    The result is cached until the monitor layout changes.
     """
+    global _monitor_cache, _monitor_cache_key
+    
+    try:
+        layout_key = _get_layout_key()
+    except Exception:
+        layout_key = None
+    
+    if _monitor_cache is not None and layout_key is not None and layout_key == _monitor_cache_key:
+        return list(_monitor_cache)
+    
     monitors = []
     
     try:
-        user32 = ctypes.windll.user32
-        
-        # Callback type for EnumDisplayMonitors
-        MONITORENUMPROC = ctypes.WINFUNCTYPE(
-            ctypes.c_bool,
-            ctypes.c_void_p,  # hMonitor
-            ctypes.c_void_p,  # hdcMonitor
-            ctypes.POINTER(RECT),  # lprcMonitor
-            ctypes.c_long  # dwData
-        )
+        user32 = _user32
+        _, mi = _get_buffers()  # Callback runs synchronously on this thread
         
         def callback(hMonitor, hdcMonitor, lprcMonitor, dwData):
-            mi = MONITORINFO()
-            mi.cbSize = ctypes.sizeof(MONITORINFO)
+            mi.cbSize = _MI_SIZE
             user32.GetMonitorInfoW(hMonitor, ctypes.byref(mi))
             r = mi.rcMonitor
             monitors.append((r.left, r.top, r.right - r.left, r.bottom - r.top))
             return True
         
         # Enumerate all monitors
-        user32.EnumDisplayMonitors(None, None, MONITORENUMPROC(callback), 0)
+        user32.EnumDisplayMonitors(None, None, _MONITORENUMPROC(callback), 0)
         
     except Exception as e:
         print(f"[MonitorUtils] Error enumerating monitors: {e}")
         # Fallback to primary
-        monitors = [(0, 0, 1920, 1080)]
+        return [(0, 0, 1920, 1080)]
+    
+    if not monitors:
+        return [(0, 0, 1920, 1080)]
     
-    return monitors if monitors else [(0, 0, 1920, 1080)]
+    # Only cache real enumeration results, never the fallback
+    if layout_key is not None:
+        _monitor_cache = monitors
+        _monitor_cache_key = layout_key
+    
+    return list(monitors)
 
 
 def is_position_visible(x: int, y: int, width: int, height: int, min_visible: int = 50) -> bool:
@@ -107,20 +200,18 @@ def is_position_visible(x: int, y: int, width: int, height: int, min_visible: in
     Returns:
         True if at least min_visible pixels of the window are on a monitor
     """
-    monitors = get_all_monitors()
+    # Window edges are loop-invariant
+    x2 = x + width
+    y2 = y + height
     
-    for mon_x, mon_y, mon_w, mon_h in monitors:
-        # Calculate overlap between window and monitor
-        overlap_left = max(x, mon_x)
-        overlap_top = max(y, mon_y)
-        overlap_right = min(x + width, mon_x + mon_w)
-        overlap_bottom = min(y + height, mon_y + mon_h)
-        
-        overlap_width = overlap_right - overlap_left
-        overlap_height = overlap_bottom - overlap_top
-        
-        # Check if there's meaningful overlap
-        if overlap_width >= min_visible and overlap_height >= min_visible:
+    for mon_x, mon_y, mon_w, mon_h in get_all_monitors():
+        # Horizontal overlap first - skip the vertical math when it already fails
+        overlap_width = min(x2, mon_x + mon_w) - max(x, mon_x)
+        if overlap_width < min_visible:
+            continue
+        
+        overlap_height = min(y2, mon_y + mon_h) - max(y, mon_y)
+        if overlap_height >= min_visible:
             return True
     
     return False
@@ -133,7 +224,7 @@ def center_window_on_monitor_at(window_handle, x: int, y: int) -> None:
     try:
         mon_x, mon_y, mon_w, mon_h = get_monitor_at_point(x, y)
         
-        user32 = ctypes.windll.user32
+        user32 = _user32
         rect = RECT()
         user32.GetWindowRect(window_handle, ctypes.byref(rect))
         
@@ -144,7 +235,7 @@ def center_window_on_monitor_at(window_handle, x: int, y: int) -> None:
         center_y = mon_y + (mon_h - win_h) // 2
         
         # SWP_NOZORDER | SWP_NOACTIVATE | SWP_NOSIZE
-        user32.SetWindowPos(window_handle, 0, center_x, center_y, 0, 0, 0x0004 | 0x0010 | 0x0001)
+        user32.SetWindowPos(window_handle, None, center_x, center_y, 0, 0, 0x0004 | 0x0010 | 0x0001)
         
     except Exception as e:
         print(f"[MonitorUtils] Error centering window: {e}")
@@ -3,13 +3,16 @@ DouyinStream Pro - Player Manager
 Multi-player detection, fallback chain, and control.
 """
 
+import atexit
+import ctypes
+import ctypes.wintypes
 import os
 import subprocess
-import shutil
-import winreg
+import threading
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, List
+from types import MappingProxyType
+from typing import Optional, List, Dict, Tuple
 from enum import Enum
 
 from config.settings_manager import get_settings
@@ -23,9 +26,9 @@ class PlayerType(Enum):
     EMBEDDED = "embedded"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PlayerInfo:
-    """Information about a detected player."""
+    """Information about a detected player (immutable, safe to share, no per-instance __dict__)."""
     name: str
     type: PlayerType
     path: str
@@ -34,147 +37,192 @@ class PlayerInfo:
     priority: int = 0  # Lower = higher priority
 
 
+# Extra command-line flags per external player
+VLC_FLAGS = ("--network-caching=1000", "--file-caching=1000")
+MPV_FLAGS = ("--cache=yes", "--demuxer-max-bytes=50M")
+FFPLAY_FLAGS = ("-autoexit",)
+
+_FLAGS_BY_TYPE: Dict[PlayerType, Tuple[str, ...]] = {
+    PlayerType.VLC: VLC_FLAGS,
+    PlayerType.MPV: MPV_FLAGS,
+    PlayerType.FFPLAY: FFPLAY_FLAGS,
+}
+
+# Null device opened once for all launches (subprocess.DEVNULL reopens it per Popen)
+try:
+    _DEVNULL = os.open(os.devnull, os.O_WRONLY)
+    atexit.register(os.close, _DEVNULL)
+except OSError:
+    _DEVNULL = subprocess.DEVNULL
+
+# Fixed Popen options for fire-and-forget player launches; CREATE_NO_WINDOW
+# hides console windows and only exists on Windows
+_POPEN_KWARGS = MappingProxyType({
+    "stdout": _DEVNULL,
+    "stderr": _DEVNULL,
+    "creationflags": getattr(subprocess, "CREATE_NO_WINDOW", 0),
+    "close_fds": True,
+})
+
+# Players launched through ShellExecuteEx (no stdio pipes or handle inheritance).
+# Only GUI-subsystem binaries: mpv may resolve to a console shim/mpv.com and
+# ffplay is a console app, so those keep Popen + CREATE_NO_WINDOW.
+_SHELL_EXECUTE_TYPES = frozenset({PlayerType.VLC})
+
+SEE_MASK_NOASYNC = 0x00000100
+SEE_MASK_FLAG_NO_UI = 0x00000400
+SW_SHOWNORMAL = 1
+
+
+class SHELLEXECUTEINFOW(ctypes.Structure):
+    _fields_ = [
+        ("cbSize", ctypes.wintypes.DWORD),
+        ("fMask", ctypes.c_ulong),
+        ("hwnd", ctypes.wintypes.HWND),
+        ("lpVerb", ctypes.wintypes.LPCWSTR),
+        ("lpFile", ctypes.wintypes.LPCWSTR),
+        ("lpParameters", ctypes.wintypes.LPCWSTR),
+        ("lpDirectory", ctypes.wintypes.LPCWSTR),
+        ("nShow", ctypes.c_int),
+        ("hInstApp", ctypes.wintypes.HINSTANCE),
+        ("lpIDList", ctypes.c_void_p),
+        ("lpClass", ctypes.wintypes.LPCWSTR),
+        ("hkeyClass", ctypes.wintypes.HKEY),
+        ("dwHotKey", ctypes.wintypes.DWORD),
+        ("hIconOrMonitor", ctypes.wintypes.HANDLE),
+        ("hProcess", ctypes.wintypes.HANDLE),
+    ]
+
+
+try:
+    _shell32 = ctypes.WinDLL("shell32")
+    _shell32.ShellExecuteExW.argtypes = [ctypes.POINTER(SHELLEXECUTEINFOW)]
+    _shell32.ShellExecuteExW.restype = ctypes.wintypes.BOOL
+except (AttributeError, OSError):
+    # Not on Windows - launches always go through subprocess
+    _shell32 = None
+
+
+def _shell_execute(path: str, args: Tuple[str, ...]) -> bool:
+    """Start path with args via ShellExecuteExW; False if unavailable or it failed."""
+    if _shell32 is None:
+        return False
+    info = SHELLEXECUTEINFOW()
+    info.cbSize = ctypes.sizeof(SHELLEXECUTEINFOW)
+    info.fMask = SEE_MASK_NOASYNC | SEE_MASK_FLAG_NO_UI
+    info.lpFile = path
+    info.lpParameters = subprocess.list2cmdline(args)
+    info.nShow = SW_SHOWNORMAL
+    return bool(_shell32.ShellExecuteExW(ctypes.byref(info)))
+
+
+# Shown when no compatible player is found
+_INSTALL_HELP = """
+No se encontró ningún reproductor compatible.
+
+Opciones de instalación:
+
+1. VLC Media Player (Recomendado):
+   • Descargar de: https://www.videolan.org/vlc/
+   • O ejecutar: winget install VideoLAN.VLC
+
+2. MPV:
+   • Instalar con Scoop: scoop install mpv
+   • O con Chocolatey: choco install mpv
+
+3. FFmpeg (incluye ffplay):
+   • winget install Gyan.FFmpeg
+   • O: choco install ffmpeg
+
+Después de instalar, reinicia DouyinStream Pro.
+"""
+
+_VLC_DOWNLOAD_URL = "https://get.videolan.org/vlc/3.0.20/win64/vlc-3.0.20-win64.exe"
+
+
 class PlayerManager:
     """
     Manages detection and launching of media players.
     Implements fallback chain: Embedded VLC -> External VLC -> MPV -> ffplay.
     """
     
-    # Common installation paths
-    VLC_PATHS = [
-        r"C:\Program Files\VideoLAN\VLC\vlc.exe",
-        r"C:\Program Files (x86)\VideoLAN\VLC\vlc.exe",
-        os.path.expandvars(r"%LOCALAPPDATA%\Programs\VideoLAN\VLC\vlc.exe"),
-    ]
-    
-    MPV_PATHS = [
-        r"C:\Program Files\mpv\mpv.exe",
-        r"C:\Program Files (x86)\mpv\mpv.exe",
-        os.path.expandvars(r"%LOCALAPPDATA%\Programs\mpv\mpv.exe"),
-        os.path.expandvars(r"%USERPROFILE%\scoop\apps\mpv\current\mpv.exe"),
-        os.path.expandvars(r"%USERPROFILE%\scoop\shims\mpv.exe"),
-    ]
+    # Player metadata by type; paths come from the settings player cache
+    _PLAYER_SPECS = (
+        ("vlc", "VLC Media Player", PlayerType.VLC, True, 1),
+        ("mpv", "MPV", PlayerType.MPV, False, 2),
+        ("ffplay", "FFplay", PlayerType.FFPLAY, False, 3),
+    )
     
     def __init__(self) -> None:
         self._settings = get_settings()
         self._detected_players: List[PlayerInfo] = []
+        self._players_tuple: Tuple[PlayerInfo, ...] = ()
+        self._by_type: Dict[PlayerType, PlayerInfo] = {}
+        self._best: Optional[PlayerInfo] = None
         self._vlc_available = False
-        self._detect_all()
-    
-    def _detect_all(self) -> None:
-        """Detect all available players."""
-        self._detected_players.clear()
-        
-        # Detect VLC
-        vlc_path = self._detect_vlc()
-        if vlc_path:
-            self._detected_players.append(PlayerInfo(
-                name="VLC Media Player",
-                type=PlayerType.VLC,
-                path=vlc_path,
-                embedded_capable=True,
-                priority=1
-            ))
-            self._vlc_available = True
         
-        # Detect MPV
-        mpv_path = self._detect_mpv()
-        if mpv_path:
-            self._detected_players.append(PlayerInfo(
-                name="MPV",
-                type=PlayerType.MPV,
-                path=mpv_path,
-                embedded_capable=False,
-                priority=2
-            ))
-        
-        # Detect ffplay
-        ffplay_path = self._detect_ffplay()
-        if ffplay_path:
-            self._detected_players.append(PlayerInfo(
-                name="FFplay",
-                type=PlayerType.FFPLAY,
-                path=ffplay_path,
-                embedded_capable=False,
-                priority=3
-            ))
-        
-        # Sort by priority
-        self._detected_players.sort(key=lambda p: p.priority)
+        # Detection is deferred to the first accessor that needs it
+        self._detected = False
+        self._detect_lock = threading.Lock()
     
-    def _detect_vlc(self) -> Optional[str]:
-        """Detect VLC via registry and common paths."""
-        # Try Windows Registry
-        try:
-            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, 
-                               r"SOFTWARE\VideoLAN\VLC") as key:
-                install_dir = winreg.QueryValueEx(key, "InstallDir")[0]
-                vlc_path = os.path.join(install_dir, "vlc.exe")
-                if os.path.exists(vlc_path):
-                    return vlc_path
-        except (WindowsError, FileNotFoundError, OSError):
-            pass
-        
-        # Try 32-bit registry on 64-bit Windows
-        try:
-            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, 
-                               r"SOFTWARE\WOW6432Node\VideoLAN\VLC") as key:
-                install_dir = winreg.QueryValueEx(key, "InstallDir")[0]
-                vlc_path = os.path.join(install_dir, "vlc.exe")
-                if os.path.exists(vlc_path):
-                    return vlc_path
-        except (WindowsError, FileNotFoundError, OSError):
-            pass
-        
-        # Try common paths
-        for path in self.VLC_PATHS:
-            if os.path.exists(path):
-                return path
-        
-        # Try PATH
-        vlc_in_path = shutil.which("vlc")
-        if vlc_in_path:
-            return vlc_in_path
-        
-        return None
+    def _ensure_detected(self) -> None:
+        """Load detected players from the settings cache on first use."""
+        if self._detected:
+            return
+        with self._detect_lock:
+            if self._detected:
+                return
+            self._load_players()
+            self._detected = True
     
-    def _detect_mpv(self) -> Optional[str]:
-        """Detect MPV via PATH and common paths."""
-        # Try PATH first
-        mpv_in_path = shutil.which("mpv")
-        if mpv_in_path:
-            return mpv_in_path
+    def _load_players(self, refresh: bool = False) -> None:
+        """
+        Build the player list from SettingsManager's PATH-keyed player cache,
+        which owns detection (missing or vanished players are re-probed there).
+        """
+        paths = self._settings.get_player_paths(refresh=refresh)
         
-        # Try common paths
-        for path in self.MPV_PATHS:
-            if os.path.exists(path):
-                return path
+        self._detected_players = [
+            PlayerInfo(
+                name=name,
+                type=player_type,
+                path=paths[key],
+                embedded_capable=embedded_capable,
+                priority=priority,
+            )
+            for key, name, player_type, embedded_capable, priority in self._PLAYER_SPECS
+            if paths.get(key)
+        ]
         
-        return None
+        # Sort by priority
+        self._detected_players.sort(key=lambda p: p.priority)
+        self._index_players()
     
-    def _detect_ffplay(self) -> Optional[str]:
-        """Detect ffplay (comes with FFmpeg)."""
-        return shutil.which("ffplay")
+    def _index_players(self) -> None:
+        """Build the lookup tables used by the getters (players must be sorted)."""
+        self._players_tuple = tuple(self._detected_players)
+        self._by_type = {p.type: p for p in self._detected_players}
+        self._best = self._detected_players[0] if self._detected_players else None
+        self._vlc_available = PlayerType.VLC in self._by_type
     
-    def get_available_players(self) -> List[PlayerInfo]:
-        """Get list of all detected players."""
-        return self._detected_players.copy()
+    def get_available_players(self) -> Tuple[PlayerInfo, ...]:
+        """Get all detected players, best first (shared read-only tuple)."""
+        self._ensure_detected()
+        return self._players_tuple
     
     def get_best_player(self) -> Optional[PlayerInfo]:
         """Get the highest priority available player."""
-        if self._detected_players:
-            return self._detected_players[0]
-        return None
+        self._ensure_detected()
+        return self._best
     
     def get_player_by_type(self, player_type: PlayerType) -> Optional[PlayerInfo]:
         """Get a specific player type if available."""
-        for player in self._detected_players:
-            if player.type == player_type:
-                return player
-        return None
+        self._ensure_detected()
+        return self._by_type.get(player_type)
     
     def is_vlc_available(self) -> bool:
         """Check if VLC is available (required for embedded mode)."""
+        self._ensure_detected()
         return self._vlc_available
     
     def get_vlc_path(self) -> Optional[str]:
@@ -204,71 +252,38 @@ class PlayerManager:
         if not player:
             return False
         
+        flags = _FLAGS_BY_TYPE.get(player.type)
+        if flags is None:
+            return False
+        
         try:
-            if player.type == PlayerType.VLC:
-                cmd = [
-                    player.path,
-                    stream_url,
-                    "--network-caching=1000",
-                    "--file-caching=1000",
-                ]
-            elif player.type == PlayerType.MPV:
-                cmd = [
-                    player.path,
-                    stream_url,
-                    "--cache=yes",
-                    "--demuxer-max-bytes=50M",
-                ]
-            elif player.type == PlayerType.FFPLAY:
-                cmd = [
-                    player.path,
-                    stream_url,
-                    "-autoexit",
-                ]
-            else:
-                return False
+            if player.type in _SHELL_EXECUTE_TYPES and _shell_execute(player.path, (stream_url, *flags)):
+                return True
             
-            subprocess.Popen(
-                cmd,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-                creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-            )
+            cmd = (player.path, stream_url, *flags)
+            
+            subprocess.Popen(cmd, **_POPEN_KWARGS)
             return True
             
         except Exception as e:
             print(f"[PlayerManager] Launch error: {e}")
             return False
     
-    def suggest_installation(self) -> str:
+    @staticmethod
+    def suggest_installation() -> str:
         """
         Suggest player installation method.
         Returns installation instructions.
         """
-        return """
-No se encontró ningún reproductor compatible.
-
-Opciones de instalación:
-
-1. VLC Media Player (Recomendado):
-   • Descargar de: https://www.videolan.org/vlc/
-   • O ejecutar: winget install VideoLAN.VLC
-
-2. MPV:
-   • Instalar con Scoop: scoop install mpv
-   • O con Chocolatey: choco install mpv
-
-3. FFmpeg (incluye ffplay):
-   • winget install Gyan.FFmpeg
-   • O: choco install ffmpeg
-
-Después de instalar, reinicia DouyinStream Pro.
-"""
+        return _INSTALL_HELP
     
-    def offer_vlc_download(self) -> str:
+    @staticmethod
+    def offer_vlc_download() -> str:
         """Return VLC download URL for auto-installation."""
-        return "https://get.videolan.org/vlc/3.0.20/win64/vlc-3.0.20-win64.exe"
+        return _VLC_DOWNLOAD_URL
     
     def refresh(self) -> None:
         """Re-scan for available players."""
-        self._detect_all()
+        with self._detect_lock:
+            self._load_players(refresh=True)
+            self._detected = True
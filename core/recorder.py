@@ -397,24 +397,29 @@ class Recorder:
             
             # Find active segment (the one being written right now)
             try:
-                # Get all ts files in temp dir
-                all_ts_files = list(self._temp_dir.glob("segment_*.ts"))
-                if all_ts_files:
-                    # Sort by modification time (newest first)
-                    all_ts_files.sort(key=lambda p: p.stat().st_mtime, reverse=True)
-                    
-                    # The newest one is likely the active one
-                    potential_active = all_ts_files[0]
+                # Get all ts files in temp dir in one scandir pass; DirEntry.stat()
+                # reuses the directory listing data on Windows instead of a stat per file
+                with os.scandir(self._temp_dir) as it:
+                    ts_entries = [
+                        (entry, entry.stat())
+                        for entry in it
+                        if entry.name.startswith("segment_") and entry.name.endswith(".ts")
+                        and entry.is_file()
+                    ]
+                if ts_entries:
+                    # The newest one (by modification time) is likely the active one
+                    newest_entry, newest_stat = max(ts_entries, key=lambda es: es[1].st_mtime)
+                    potential_active = Path(newest_entry.path)
                     
                     # Check if it's already in our known valid segments
                     known_paths = {s.path for s in valid_segments}
                     
                     if potential_active not in known_paths:
                         # It's new! Check if it has data
-                        size = potential_active.stat().st_size
+                        size = newest_stat.st_size
                         if size > 1024: # > 1KB
                             # Create a temporary segment for the active part
-                            timestamp = datetime.fromtimestamp(potential_active.stat().st_mtime)
+                            timestamp = datetime.fromtimestamp(newest_stat.st_mtime)
                             # Estimate duration from size (very rough approx, assuming 3MB/s for 1080p high bitrate)
                             # Or just assume it's the latest snippet. 
                             # Better: let ffmpeg probe it or just count it.
@@ -4,8 +4,17 @@ Simple, modular stream status checker with threading support.
 """
 
 import logging
-from typing import Optional, Dict, Callable
-from core.stream_engine import StreamEngine
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from threading import Lock
+from typing import Optional, Dict, Callable, Tuple
+from core.stream_engine import StreamEngine, StreamResolveError
+
+
+# Progress statuses reported to on_progress; _STATUS is indexed by is_live
+_CHECKING = "checking"
+_STATUS = ("offline", "live")
 
 
 class StreamChecker:
@@ -14,16 +23,55 @@ class StreamChecker:
     Checks if streams are live without blocking UI.
     """
     
-    def __init__(self, stream_engine: StreamEngine):
+    # Upper bound on concurrent checks in check_batch
+    MAX_WORKERS = 16
+    
+    def __init__(self, stream_engine: StreamEngine, ttl: float = 30.0, max_entries: int = 512,
+                 error_ttl: float = 10.0):
         """
         Initialize checker with stream engine.
         
         Args:
             stream_engine: StreamEngine instance for checking streams
+            ttl: Seconds a cached status stays valid (default: 30)
+            max_entries: Cached URLs kept before evicting the least recently used
+            error_ttl: Seconds a failed check is remembered as offline (default: 10)
         """
         self.engine = stream_engine
         self.checking = False
-        self._cache: Dict[str, bool] = {}
+        self._ttl = ttl
+        self._error_ttl = error_ttl
+        self._max_entries = max_entries
+        # url -> (monotonic expiry time, is_live), least recently used first
+        self._cache: "OrderedDict[str, Tuple[float, bool]]" = OrderedDict()
+        self._cache_lock = Lock()  # check_batch calls check_single from worker threads
+    
+    def _get_fresh(self, url: str) -> Optional[bool]:
+        """Return the cached status if it has not expired."""
+        with self._cache_lock:
+            entry = self._cache.get(url)
+            if entry is None:
+                return None
+            if time.monotonic() >= entry[0]:
+                del self._cache[url]
+                return None
+            self._cache.move_to_end(url)
+            return entry[1]
+    
+    def _store(self, url: str, is_live: bool, ttl: Optional[float] = None) -> None:
+        """Cache a status for ttl seconds (default: self._ttl), evicting the oldest entries past max_entries."""
+        now = time.monotonic()
+        expires = now + (self._ttl if ttl is None else ttl)
+        with self._cache_lock:
+            # A concurrent check already stored the same answer for at least as long;
+            # a short error entry must not keep a real result from its full TTL
+            entry = self._cache.get(url)
+            if entry is not None and entry[1] == is_live and expires <= entry[0]:
+                return
+            self._cache[url] = (expires, is_live)
+            self._cache.move_to_end(url)
+            while len(self._cache) > self._max_entries:
+                self._cache.popitem(last=False)
     
     def check_single(self, url: str, timeout: int = 5) -> bool:
         """
@@ -36,51 +84,107 @@ class StreamChecker:
         Returns:
             True if stream is live, False otherwise
         """
+        cached = self._get_fresh(url)
+        if cached is not None:
+            logging.debug(f"[StreamChecker] Cached result for {url}: {'LIVE' if cached else 'OFFLINE'}")
+            return cached
+        
         try:
             logging.debug(f"[StreamChecker] Checking: {url}")
             
             # Try to get available streams
-            streams = self.engine.get_available_streams(url)
+            # Errors raise instead of looking like an offline stream
+            streams = self.engine.get_available_streams(url, raise_errors=True)
             
             is_live = bool(streams)
             
             # Cache result
-            self._cache[url] = is_live
+            self._store(url, is_live)
             
             logging.debug(f"[StreamChecker] Result: {'LIVE' if is_live else 'OFFLINE'}")
             return is_live
             
         except Exception as e:
             logging.debug(f"[StreamChecker] Error checking {url}: {e}")
+            # Remember the failure briefly so a refresh loop doesn't re-probe a dead URL
+            self._store(url, False, ttl=self._error_ttl)
             return False
     
-    def check_batch(self, urls: list, on_progress: Optional[Callable[[str, str], None]] = None) -> Dict[str, bool]:
+    def check_batch(self, urls: list, on_progress: Optional[Callable[[str, str], None]] = None,
+                    on_result: Optional[Callable[[str, bool, float], None]] = None) -> Dict[str, bool]:
         """
-        Check multiple streams sequentially.
+        Check multiple streams concurrently.
         
         Args:
             urls: List of URLs to check
             on_progress: Callback(url, status) called for each URL
                         status can be: "checking", "live", "offline"
+                        (results are reported in completion order)
+            on_result: Callback(url, is_live, elapsed_ms) called once per URL
+                       when its result is known; elapsed_ms is how long that
+                       URL's own check took (near zero for cache hits).
+                       Replaces on_progress (no "checking" events) to halve
+                       UI callbacks
             
         Returns:
             Dictionary mapping URL to live status
         """
         results = {}
         
-        for url in urls:
-            # Notify checking
-            if on_progress:
-                on_progress(url, "checking")
-            
-            # Check stream
-            is_live = self.check_single(url)
+        def report(url: str, is_live: bool, elapsed_ms: float) -> None:
             results[url] = is_live
+            if on_result:
+                on_result(url, is_live, elapsed_ms)
+            elif on_progress:
+                on_progress(url, _STATUS[is_live])
+        
+        def timed_check(url: str) -> Tuple[bool, float]:
+            started = time.perf_counter()
+            is_live = self.check_single(url)
+            return is_live, (time.perf_counter() - started) * 1000
+        
+        if on_progress and not on_result:
+            for url in urls:
+                on_progress(url, _CHECKING)
+        
+        if len(urls) > 1:
+            # Fresh cache hits don't need a probe
+            pending = []
+            for url in urls:
+                started = time.perf_counter()
+                cached = self._get_fresh(url)
+                if cached is None:
+                    pending.append(url)
+                else:
+                    report(url, cached, (time.perf_counter() - started) * 1000)
+            
+            batch = getattr(self.engine, "get_available_streams_batch", None)
+            if batch is not None:
+                # Engine resolves the whole batch over its pooled session
+                def on_engine_result(url: str, streams, elapsed_ms: float) -> None:
+                    if isinstance(streams, StreamResolveError):
+                        logging.debug(f"[StreamChecker] Error checking {url}: {streams}")
+                        self._store(url, False, ttl=self._error_ttl)
+                        report(url, False, elapsed_ms)
+                        return
+                    is_live = bool(streams)
+                    self._store(url, is_live)
+                    report(url, is_live, elapsed_ms)
+                
+                batch(pending, max_workers=self.MAX_WORKERS, on_result=on_engine_result,
+                      raise_errors=True)
+            elif pending:
+                with ThreadPoolExecutor(max_workers=min(self.MAX_WORKERS, len(pending)),
+                                        thread_name_prefix="stream-check") as pool:
+                    futures = {pool.submit(timed_check, url): url for url in pending}
+                    for future in as_completed(futures):
+                        report(futures[future], *future.result())
             
-            # Notify result
-            if on_progress:
-                status = "live" if is_live else "offline"
-                on_progress(url, status)
+            # Keep the caller's ordering
+            return {url: results[url] for url in urls}
+        
+        for url in urls:
+            report(url, *timed_check(url))
         
         return results
     
@@ -92,10 +196,11 @@ class StreamChecker:
             url: Stream URL
             
         Returns:
-            True if live, False if offline, None if not cached
+            True if live, False if offline, None if not cached or expired
         """
-        return self._cache.get(url)
+        return self._get_fresh(url)
     
     def clear_cache(self):
         """Clear all cached results."""
-        self._cache.clear()
+        with self._cache_lock:
+            self._cache.clear()
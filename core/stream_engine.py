@@ -3,13 +3,19 @@ DouyinStream Pro - Stream Engine
 Core logic for stream detection, URL resolution, and player launching.
 """
 
+import json
+import os
 import re
 import sys
 import subprocess
 import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from enum import Enum
-from typing import Callable, Optional
+from functools import lru_cache
+from typing import Callable, Optional, Union
 from pathlib import Path
 
 try:
@@ -45,6 +51,10 @@ class StreamInfo:
     streamer_name: str
 
 
+class StreamResolveError(Exception):
+    """Resolving a URL failed (as opposed to the stream being offline)."""
+
+
 class StreamEngine:
     """
     Core engine for stream detection and resolution.
@@ -98,6 +108,39 @@ class StreamEngine:
         ],
     }
     
+    # All patterns as one anchored alternation, tried in the order above.
+    # Group names are "<platform>__<index>" so lastgroup yields the platform.
+    _PLATFORM_RE = re.compile(
+        "|".join(
+            f"(?P<{platform}__{i}>{pattern})"
+            for platform, patterns in PLATFORM_PATTERNS.items()
+            for i, pattern in enumerate(patterns)
+        ),
+        re.IGNORECASE,
+    )
+    
+    # Host substring -> platform, checked before any regex runs. The needle
+    # only picks a candidate; that platform's own patterns still validate it.
+    _HOST_PLATFORMS = (
+        ("douyin.com", "douyin"),
+        ("tiktok.com", "tiktok"),
+        ("twitch.tv", "twitch"),
+        ("youtube.com", "youtube"),
+        ("youtu.be", "youtube"),
+        ("kick.com", "kick"),
+        ("bilibili.com", "bilibili"),
+        ("huya.com", "huya"),
+        ("afreecatv.com", "afreecatv"),
+        ("facebook.com", "facebook"),
+        ("dailymotion.com", "dailymotion"),
+    )
+    
+    # Per-platform alternations for validating a host-substring candidate
+    _PLATFORM_RES = {
+        platform: re.compile("|".join(patterns), re.IGNORECASE)
+        for platform, patterns in PLATFORM_PATTERNS.items()
+    }
+    
     # Display names for platforms
     PLATFORM_NAMES = {
         "douyin": "🇨🇳 Douyin",
@@ -119,6 +162,17 @@ class StreamEngine:
         "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
     }
     
+    # Concurrent resolves in get_available_streams_batch. Matches requests'
+    # default per-host pool size so every worker keeps a pooled connection.
+    BATCH_MAX_WORKERS = 10
+    
+    # Browser cookies are cached in data/browser_cookies.json for at most this
+    # long. A cache hit is still revalidated against the browser in background.
+    COOKIE_CACHE_TTL_SEC = 6 * 3600
+    
+    # Streamlink stderr lines kept per launch for error reporting
+    STDERR_TAIL_LINES = 200
+    
     def __init__(self) -> None:
         self._settings = get_settings()
         self._session: Optional[Streamlink] = None
@@ -135,81 +189,158 @@ class StreamEngine:
         if STREAMLINK_AVAILABLE:
             self._init_session()
     
+    # Session options shared by every engine. Twitch-specific ones request
+    # low latency (if the broadcaster has it enabled) and prefer AV1, which
+    # may have fewer embed ads.
+    SESSION_OPTIONS = (
+        ("http-headers", DOUYIN_HEADERS),
+        ("stream-segment-threads", 3),
+        ("hls-live-edge", 3),
+        ("ringbuffer-size", 32 * 1024 * 1024),  # 32MB buffer
+        ("twitch-low-latency", True),
+        ("twitch-supported-codecs", "av1,h264"),
+    )
+    
+    # Cookie domain for browser cookies - requests only sends them to Douyin hosts
+    DOUYIN_COOKIE_DOMAIN = ".douyin.com"
+    
     def _init_session(self) -> None:
-        """Initialize Streamlink session with custom options."""
-        self._session = Streamlink()
-        
-        # Set options for better compatibility
-        self._session.set_option("http-headers", self.DOUYIN_HEADERS)
-        self._session.set_option("stream-segment-threads", 3)
-        self._session.set_option("hls-live-edge", 3)
-        self._session.set_option("ringbuffer-size", 32 * 1024 * 1024)  # 32MB buffer
-        
-        # Twitch-specific options for lower latency and potentially fewer ads
-        # Low latency mode (if broadcaster has it enabled)
-        self._session.set_option("twitch-low-latency", True)
-        # Prefer AV1 codec which may have fewer embed ads
-        self._session.set_option("twitch-supported-codecs", "av1,h264")
+        """Attach the shared Streamlink session, creating it on first use."""
+        self._session = _get_shared_session(self.SESSION_OPTIONS)
         
         # Apply browser cookies for platforms that require authentication (Douyin)
         self._apply_browser_cookies()
     
-    def _apply_browser_cookies(self) -> None:
-        """Extract and apply Douyin cookies from browser for authentication."""
+    def _cookie_cache_path(self) -> Path:
+        """Location of the on-disk browser cookie cache."""
+        return self._settings.get_data_path() / "browser_cookies.json"
+    
+    def _load_cookie_cache(self) -> Optional[dict]:
+        """Return cached browser cookies if they are younger than COOKIE_CACHE_TTL_SEC."""
+        cache_path = self._cookie_cache_path()
+        try:
+            if cache_path.stat().st_mtime < time.time() - self.COOKIE_CACHE_TTL_SEC:
+                return None
+            cookies = json.loads(cache_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+        return cookies if isinstance(cookies, dict) and cookies else None
+    
+    def _save_cookie_cache(self, cookies: dict) -> None:
+        """
+        Persist extracted cookies atomically (temp file + rename).
+        They are live session tokens, so the file is created owner-only.
+        """
+        cache_path = self._cookie_cache_path()
+        tmp_path = cache_path.with_suffix(".json.tmp")
+        try:
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with open(fd, 'w', encoding='utf-8') as f:
+                json.dump(cookies, f)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass
+    
+    def _invalidate_cookie_cache(self) -> None:
+        """Delete the on-disk cookie cache so the next start re-reads the browser."""
+        try:
+            self._cookie_cache_path().unlink()
+        except OSError:
+            pass
+    
+    def _set_cookies(self, cookies: dict) -> None:
+        """Apply cookies to the Streamlink session and the custom extractors."""
+        # Scoped to Douyin so Twitch/YouTube requests don't carry them
+        jar = self._session.http.cookies
+        for name, value in cookies.items():
+            jar.set(name, value, domain=self.DOUYIN_COOKIE_DOMAIN)
+        # Store cookies for custom extractors
+        self._browser_cookies = cookies
+    
+    def _revalidate_cookie_cache(self, cached: dict) -> None:
+        """
+        Re-read the browser after serving cookies from the cache (runs on a
+        daemon thread). If the user logged in or out meanwhile, the browser's
+        cookies differ - replace the cache and the applied cookies with them.
+        """
+        fresh = self._extract_browser_cookies()
+        # None: browser-cookie3 missing; {}: nothing read (DB locked/timeout)
+        if fresh and fresh != cached:
+            self._save_cookie_cache(fresh)
+            self._set_cookies(fresh)
+            self._log(f"✓ Cookies del navegador actualizadas ({len(fresh)})")
+    
+    def _extract_browser_cookies(self) -> Optional[dict]:
+        """
+        Read Douyin cookies from Chrome, then Edge.
+        Returns None if browser-cookie3 is not installed.
+        """
         try:
             import browser_cookie3
-            import threading
+        except ImportError:
+            return None
+        
+        # Use a timeout to prevent hanging if browser DB is locked
+        cookies_result = {'cookies': None, 'browser': None}
+        
+        def extract_cookies():
+            """Extract cookies in a separate thread with timeout protection."""
+            # browser_cookie3 matches host keys by substring, so one query
+            # covers .douyin.com, douyin.com and live.douyin.com
+            domain = 'douyin.com'
             
-            # Use a timeout to prevent hanging if browser DB is locked
-            cookies_result = {'cookies': None, 'browser': None}
+            # Try Chrome first, then Edge (most common on Windows)
+            browser_functions = [
+                ('Chrome', browser_cookie3.chrome),
+                ('Edge', browser_cookie3.edge),
+            ]
             
-            def extract_cookies():
-                """Extract cookies in a separate thread with timeout protection."""
-                # Key Douyin domains to extract cookies from
-                domains = ['.douyin.com', 'douyin.com', 'live.douyin.com']
-                
-                # Try Chrome first, then Edge (most common on Windows)
-                browser_functions = [
-                    ('Chrome', browser_cookie3.chrome),
-                    ('Edge', browser_cookie3.edge),
-                ]
-                
-                for browser_name, browser_fn in browser_functions:
-                    try:
-                        all_cookies = {}
-                        for domain in domains:
-                            try:
-                                cj = browser_fn(domain_name=domain)
-                                for cookie in cj:
-                                    all_cookies[cookie.name] = cookie.value
-                            except Exception:
-                                continue
+            for browser_name, browser_fn in browser_functions:
+                try:
+                    all_cookies = {cookie.name: cookie.value for cookie in browser_fn(domain_name=domain)}
+                    
+                    if all_cookies:
+                        cookies_result['cookies'] = all_cookies
+                        cookies_result['browser'] = browser_name
+                        return
                         
-                        if all_cookies:
-                            cookies_result['cookies'] = all_cookies
-                            cookies_result['browser'] = browser_name
-                            return
-                            
-                    except Exception:
-                        # Browser not available or locked, try next
-                        continue
-            
-            # Run extraction in thread with timeout
-            thread = threading.Thread(target=extract_cookies, daemon=True)
-            thread.start()
-            thread.join(timeout=2.0)  # 2 second timeout
+                except Exception:
+                    # Browser not available or locked, try next
+                    continue
+        
+        # Run extraction in thread with timeout
+        thread = threading.Thread(target=extract_cookies, daemon=True)
+        thread.start()
+        thread.join(timeout=2.0)  # 2 second timeout
+        
+        return cookies_result['cookies'] or {}
+    
+    def _apply_browser_cookies(self) -> None:
+        """Extract and apply Douyin cookies from browser for authentication."""
+        try:
+            cookies = self._load_cookie_cache()
+            if cookies is None:
+                cookies = self._extract_browser_cookies()
+                if cookies is None:
+                    # Silent - browser-cookie3 is optional
+                    return
+                if cookies:
+                    self._save_cookie_cache(cookies)
+            else:
+                # Serve the cache now, check it against the browser meanwhile
+                threading.Thread(
+                    target=self._revalidate_cookie_cache, args=(cookies,), daemon=True
+                ).start()
             
-            if cookies_result['cookies']:
-                self._session.set_option("http-cookies", cookies_result['cookies'])
-                # Store cookies for custom extractors
-                self._browser_cookies = cookies_result['cookies']
+            if cookies:
+                self._set_cookies(cookies)
                 
                 # Log cookies found
-                cookie_count = len(cookies_result['cookies'])
+                cookie_count = len(cookies)
                 self._log(f"✓ {cookie_count} cookies extraídas del navegador")
                 
                 # Check if Douyin cookies exist
-                douyin_cookies = [name for name in cookies_result['cookies'].keys() 
+                douyin_cookies = [name for name in cookies.keys() 
                                  if 'douyin' in name.lower() or 'ttwid' in name.lower()]
                 if douyin_cookies:
                     self._log(f"✓ Cookies de Douyin encontradas: {len(douyin_cookies)}")
@@ -221,9 +352,6 @@ class StreamEngine:
                 self._log("⚠️ No se encontraron cookies del navegador", "WARNING")
                 self._log("   Para Douyin: inicia sesión en https://www.douyin.com", "WARNING")
             
-        except ImportError:
-            # Silent - browser-cookie3 is optional
-            pass
         except Exception:
             # Silent - cookie extraction is best-effort
             pass
@@ -253,11 +381,7 @@ class StreamEngine:
     
     def detect_platform(self, url: str) -> Optional[str]:
         """Detect which platform the URL belongs to. Returns platform key or None."""
-        for platform, patterns in self.PLATFORM_PATTERNS.items():
-            for pattern in patterns:
-                if re.match(pattern, url, re.IGNORECASE):
-                    return platform
-        return None
+        return _detect_platform_cached(url)
     
     def get_platform_name(self, url: str) -> str:
         """Get display name for platform from URL."""
@@ -268,52 +392,7 @@ class StreamEngine:
     
     def extract_streamer_name(self, url: str) -> str:
         """Extract streamer name from URL for any supported platform."""
-        platform = self.detect_platform(url)
-        
-        if platform == "douyin":
-            match = re.search(r'live\.douyin\.com/(\d+)', url)
-            if match:
-                return f"room_{match.group(1)}"
-        
-        elif platform == "tiktok":
-            match = re.search(r'tiktok\.com/@([\w.]+)', url)
-            if match:
-                return match.group(1)
-        
-        elif platform == "twitch":
-            match = re.search(r'twitch\.tv/(\w+)', url)
-            if match:
-                return match.group(1)
-        
-        elif platform == "youtube":
-            match = re.search(r'youtube\.com/@([\w-]+)', url)
-            if match:
-                return match.group(1)
-            match = re.search(r'youtube\.com/channel/([\w-]+)', url)
-            if match:
-                return match.group(1)
-        
-        elif platform == "kick":
-            match = re.search(r'kick\.com/(\w+)', url)
-            if match:
-                return match.group(1)
-        
-        elif platform == "bilibili":
-            match = re.search(r'live\.bilibili\.com/(\d+)', url)
-            if match:
-                return f"room_{match.group(1)}"
-        
-        elif platform == "cc163":
-            match = re.search(r'cc\.163\.com/(\d+)', url)
-            if match:
-                return f"room_{match.group(1)}"
-        
-        elif platform == "huya":
-            match = re.search(r'huya\.com/(\w+)', url)
-            if match:
-                return match.group(1)
-        
-        return "unknown_streamer"
+        return _extract_streamer_name_cached(url)
     
     def check_stream_online(self, url: str) -> Optional[bool]:
         """
@@ -329,10 +408,12 @@ class StreamEngine:
         except Exception:
             return None
     
-    def get_available_streams(self, url: str) -> Optional[StreamInfo]:
+    def get_available_streams(self, url: str, raise_errors: bool = False) -> Optional[StreamInfo]:
         """
         Resolve stream URL and get available qualities.
         Returns StreamInfo or None if stream is not available.
+        With raise_errors, a resolve failure raises StreamResolveError
+        instead of returning None, so callers can tell it from "offline".
         """
         if not STREAMLINK_AVAILABLE:
             self._log("Streamlink no está instalado", "ERROR")
@@ -372,8 +453,49 @@ class StreamEngine:
             self._log(f"Error al resolver stream: {e}", "ERROR")
             for callback in self._callbacks.get("on_stream_error", []):
                 callback(str(e))
+            if raise_errors:
+                raise StreamResolveError(str(e)) from e
             return None
     
+    def get_available_streams_batch(
+        self,
+        urls: list,
+        max_workers: int = BATCH_MAX_WORKERS,
+        on_result: Optional[Callable[[str, Optional[StreamInfo], float], None]] = None,
+        raise_errors: bool = False,
+    ) -> dict[str, Union[StreamInfo, StreamResolveError, None]]:
+        """
+        Resolve several URLs concurrently with get_available_streams.
+        All workers share the Streamlink session, so URLs on the same host
+        reuse its keep-alive connections instead of a new TLS handshake each.
+        on_result(url, info, elapsed_ms) is called on the calling thread as
+        each finishes; elapsed_ms is that URL's own resolve time.
+        With raise_errors, a failed URL's info is its StreamResolveError
+        instead of None.
+        """
+        results: dict[str, Union[StreamInfo, StreamResolveError, None]] = {}
+        if not urls:
+            return results
+        
+        def resolve(url: str):
+            started = time.perf_counter()
+            try:
+                info = self.get_available_streams(url, raise_errors)
+            except StreamResolveError as e:
+                info = e
+            return info, (time.perf_counter() - started) * 1000
+        
+        workers = min(max_workers, self.BATCH_MAX_WORKERS, len(urls))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="stream-resolve") as pool:
+            futures = {pool.submit(resolve, url): url for url in urls}
+            for future in as_completed(futures):
+                url = futures[future]
+                results[url], elapsed_ms = future.result()
+                if on_result:
+                    on_result(url, results[url], elapsed_ms)
+        
+        return results
+    
     def get_stream_url(self, url: str, quality: str = "best") -> Optional[str]:
         """Get direct stream URL for given quality."""
         if not STREAMLINK_AVAILABLE or not self._session:
@@ -412,9 +534,18 @@ class StreamEngine:
     def _get_douyin_stream_url(self, url: str) -> Optional[str]:
         """Get Douyin stream URL using custom extractor (fallback when Streamlink fails)."""
         try:
-            extractor = DouyinExtractor(cookies=self._browser_cookies)
+            # A copy, so cookies changed by a CAPTCHA solve can be detected
+            extractor = DouyinExtractor(cookies=dict(self._browser_cookies))
             stream_info = extractor.extract_stream_url(url)
             
+            if extractor.cookies != self._browser_cookies:
+                # CAPTCHA solved: the cached browser cookies are stale
+                self._invalidate_cookie_cache()
+                if self._session:
+                    self._set_cookies(extractor.cookies)
+                else:
+                    self._browser_cookies = extractor.cookies
+            
             if stream_info and stream_info.get('is_live'):
                 self._log(f"✓ Extractor personalizado encontró stream: {stream_info.get('title')}")
                 return stream_info.get('url')
@@ -429,6 +560,25 @@ class StreamEngine:
             self._log(f"Error en extractor personalizado: {e}", "ERROR")
             return None
     
+    def _wait_launched(self, process: subprocess.Popen) -> None:
+        """
+        Block until a launched player exits and report unexpected failures.
+        stderr is drained meanwhile (keeping only the last lines) so the pipe
+        can't fill up and block streamlink during long sessions.
+        """
+        stderr_tail = deque(maxlen=self.STDERR_TAIL_LINES)
+        with process.stderr:
+            for line in iter(process.stderr.readline, b''):
+                stderr_tail.append(line)
+        
+        process.wait()
+        unregister_process(process)
+        
+        # A stop_stream() kill clears _current_process first - not an error
+        if process.returncode and self._current_process is process and stderr_tail:
+            last_line = stderr_tail[-1].decode('utf-8', 'replace').strip()
+            self._log(f"Streamlink terminó con código {process.returncode}: {last_line}", "WARNING")
+    
     def play_in_vlc(self, url: str, quality: str = "best") -> bool:
         """
         Launch stream in external VLC player.
@@ -457,12 +607,15 @@ class StreamEngine:
                     quality
                 ]
                 
-                self._current_process = register_process(subprocess.Popen(
+                # stdout is never read; stderr is drained so the pipe can't fill
+                # up and block streamlink during long sessions
+                process = register_process(subprocess.Popen(
                     cmd,
-                    stdout=subprocess.PIPE,
+                    stdout=subprocess.DEVNULL,
                     stderr=subprocess.PIPE,
                     creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
                 ))
+                self._current_process = process
                 
                 for callback in self._callbacks.get("on_stream_start", []):
                     callback(url, quality)
@@ -470,9 +623,7 @@ class StreamEngine:
                 self._log("VLC iniciado correctamente")
                 
                 # Wait for process to finish
-                self._current_process.wait()
-                
-                unregister_process(self._current_process)
+                self._wait_launched(process)
                 
                 for callback in self._callbacks.get("on_stream_stop", []):
                     callback()
@@ -514,19 +665,20 @@ class StreamEngine:
                     quality
                 ]
                 
-                self._current_process = register_process(subprocess.Popen(
+                # stdout is never read; stderr is drained so the pipe can't fill
+                # up and block streamlink during long sessions
+                process = register_process(subprocess.Popen(
                     cmd,
-                    stdout=subprocess.PIPE,
+                    stdout=subprocess.DEVNULL,
                     stderr=subprocess.PIPE,
                     creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
                 ))
+                self._current_process = process
                 
                 for callback in self._callbacks.get("on_stream_start", []):
                     callback(url, quality)
                 
-                self._current_process.wait()
-                
-                unregister_process(self._current_process)
+                self._wait_launched(process)
                 
                 for callback in self._callbacks.get("on_stream_stop", []):
                     callback()
@@ -544,8 +696,9 @@ class StreamEngine:
         """Stop current stream playback."""
         if self._current_process:
             try:
-                kill_process_tree(self._current_process)
-                self._current_process = None
+                # Clear before killing so the launcher sees a requested stop
+                process, self._current_process = self._current_process, None
+                kill_process_tree(process)
                 self._log("Stream detenido")
                 for callback in self._callbacks.get("on_stream_stop", []):
                     callback()
@@ -555,3 +708,71 @@ class StreamEngine:
     def is_playing(self) -> bool:
         """Check if a stream is currently playing."""
         return self._current_process is not None and self._current_process.poll() is None
+
+
+# Streamlink sessions keyed by their options. Creating one loads every plugin,
+# so engines with the same configuration share a single session.
+_SESSION_CACHE: dict[tuple, "Streamlink"] = {}
+_SESSION_LOCK = threading.Lock()
+
+
+def _get_shared_session(options: tuple) -> "Streamlink":
+    """Return the Streamlink session configured with options, creating it once."""
+    key = tuple(
+        (name, tuple(sorted(value.items())) if isinstance(value, dict) else value)
+        for name, value in options
+    )
+    with _SESSION_LOCK:
+        session = _SESSION_CACHE.get(key)
+        if session is None:
+            session = Streamlink()
+            for name, value in options:
+                session.set_option(name, value)
+            _SESSION_CACHE[key] = session
+        return session
+
+
+# URL parsing is pure and the pattern tables are immutable, so results are
+# memoized per URL string; one user action looks the same URL up several times
+@lru_cache(maxsize=512)
+def _detect_platform_cached(url: str) -> Optional[str]:
+    """Platform key for url (see StreamEngine.PLATFORM_PATTERNS), or None."""
+    low = url.lower()
+    for needle, platform in StreamEngine._HOST_PLATFORMS:
+        if needle in low:
+            if StreamEngine._PLATFORM_RES[platform].match(url):
+                return platform
+            break
+    
+    # Needle missed or matched only in the path/query - try every pattern
+    match = StreamEngine._PLATFORM_RE.match(url)
+    if match:
+        return match.lastgroup.partition("__")[0]
+    return None
+
+
+# Streamer name patterns per platform: (compiled regex, name template),
+# tried in order until one matches
+_STREAMER_PATTERNS: dict[str, tuple[tuple[re.Pattern, str], ...]] = {
+    "douyin": ((re.compile(r'live\.douyin\.com/(\d+)'), "room_{}"),),
+    "tiktok": ((re.compile(r'tiktok\.com/@([\w.]+)'), "{}"),),
+    "twitch": ((re.compile(r'twitch\.tv/(\w+)'), "{}"),),
+    "youtube": (
+        (re.compile(r'youtube\.com/@([\w-]+)'), "{}"),
+        (re.compile(r'youtube\.com/channel/([\w-]+)'), "{}"),
+    ),
+    "kick": ((re.compile(r'kick\.com/(\w+)'), "{}"),),
+    "bilibili": ((re.compile(r'live\.bilibili\.com/(\d+)'), "room_{}"),),
+    "huya": ((re.compile(r'huya\.com/(\w+)'), "{}"),),
+}
+
+
+@lru_cache(maxsize=512)
+def _extract_streamer_name_cached(url: str) -> str:
+    """Extract streamer name from URL for any supported platform."""
+    for pattern, template in _STREAMER_PATTERNS.get(_detect_platform_cached(url), ()):
+        match = pattern.search(url)
+        if match:
+            return template.format(match.group(1))
+    
+    return "unknown_streamer"
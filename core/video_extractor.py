@@ -3,10 +3,18 @@ DouyinStream Pro - Video Extractor
 Uses yt-dlp Python API to extract video URLs in maximum quality.
 """
 
+import atexit
+import queue
 import threading
 from typing import Callable, Optional
 from dataclasses import dataclass
 
+try:
+    import yt_dlp
+    YT_DLP_AVAILABLE = True
+except ImportError:
+    YT_DLP_AVAILABLE = False
+
 
 @dataclass
 class VideoInfo:
@@ -26,6 +34,9 @@ class VideoExtractor:
     Uses yt-dlp Python API directly (no subprocess).
     """
     
+    # Concurrent extract_async calls; each worker keeps its own YoutubeDL
+    MAX_WORKERS = 4
+    
     def __init__(self) -> None:
         self._ydl_opts = {
             'format': 'best',
@@ -33,59 +44,99 @@ class VideoExtractor:
             'no_warnings': True,
             'extract_flat': False,
         }
+        # YoutubeDL is not thread-safe: each thread reuses its own instance,
+        # keeping its initialized extractors without serializing extractions
+        self._local = threading.local()
+        # extract_async queue, drained by up to MAX_WORKERS long-lived daemon
+        # threads (daemon, so a slow extraction never blocks app exit)
+        self._tasks: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._workers: list[threading.Thread] = []
+        self._workers_lock = threading.Lock()
+        atexit.register(self.shutdown)
+    
+    def _get_ydl(self):
+        """Return this thread's YoutubeDL instance, creating it on first use."""
+        ydl = getattr(self._local, "ydl", None)
+        if ydl is None:
+            ydl = self._local.ydl = yt_dlp.YoutubeDL(self._ydl_opts)
+        return ydl
+    
+    def _close_local_ydl(self) -> None:
+        """Close the calling thread's YoutubeDL; other threads' instances are left alone."""
+        ydl = getattr(self._local, "ydl", None)
+        if ydl is None:
+            return
+        self._local.ydl = None
+        try:
+            ydl.close()
+        except Exception:
+            pass
+    
+    def _worker(self) -> None:
+        """Run queued extractions, reusing this thread's YoutubeDL until shutdown."""
+        try:
+            while True:
+                task = self._tasks.get()
+                if task is None:
+                    break
+                url, callback = task
+                try:
+                    callback(self.extract(url))
+                except Exception as e:
+                    print(f"[VideoExtractor] Callback error: {e}")
+        finally:
+            self._close_local_ydl()
     
     def extract(self, url: str) -> Optional[VideoInfo]:
         """
         Extract video URL synchronously.
         Returns VideoInfo with direct playable URL or None on error.
         """
-        try:
-            import yt_dlp
-            
-            with yt_dlp.YoutubeDL(self._ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-                
-                if not info:
-                    print("[VideoExtractor] No info extracted")
-                    return None
-                
-                # Get direct URL
-                direct_url = info.get('url', '')
-                
-                # If no direct URL, try formats
-                if not direct_url:
-                    formats = info.get('formats', [])
-                    if formats:
-                        # Get best format (last one is usually best)
-                        best = formats[-1]
-                        direct_url = best.get('url', '')
-                
-                # Try requested_formats for merged streams
-                if not direct_url:
-                    req_formats = info.get('requested_formats', [])
-                    if req_formats:
-                        # Use video stream
-                        for fmt in req_formats:
-                            if fmt.get('vcodec', 'none') != 'none':
-                                direct_url = fmt.get('url', '')
-                                break
-                
-                if not direct_url:
-                    print("[VideoExtractor] No direct URL found")
-                    return None
-                
-                return VideoInfo(
-                    url=url,
-                    direct_url=direct_url,
-                    title=info.get('title', 'Unknown'),
-                    quality=info.get('format', 'best'),
-                    duration=info.get('duration'),
-                    thumbnail=info.get('thumbnail')
-                )
-                
-        except ImportError:
+        if not YT_DLP_AVAILABLE:
             print("[VideoExtractor] yt-dlp not installed. Run: pip install yt-dlp")
             return None
+        
+        try:
+            info = self._get_ydl().extract_info(url, download=False)
+            
+            if not info:
+                print("[VideoExtractor] No info extracted")
+                return None
+            
+            # Get direct URL
+            direct_url = info.get('url', '')
+            
+            # If no direct URL, try formats
+            if not direct_url:
+                formats = info.get('formats', [])
+                if formats:
+                    # Get best format (last one is usually best)
+                    best = formats[-1]
+                    direct_url = best.get('url', '')
+            
+            # Try requested_formats for merged streams
+            if not direct_url:
+                req_formats = info.get('requested_formats', [])
+                if req_formats:
+                    # Use video stream
+                    for fmt in req_formats:
+                        if fmt.get('vcodec', 'none') != 'none':
+                            direct_url = fmt.get('url', '')
+                            break
+            
+            if not direct_url:
+                print("[VideoExtractor] No direct URL found")
+                return None
+            
+            return VideoInfo(
+                url=url,
+                direct_url=direct_url,
+                title=info.get('title', 'Unknown'),
+                quality=info.get('format', 'best'),
+                duration=info.get('duration'),
+                thumbnail=info.get('thumbnail')
+            )
+            
         except Exception as e:
             print(f"[VideoExtractor] Error: {e}")
             return None
@@ -95,17 +146,37 @@ class VideoExtractor:
         Extract video URL asynchronously.
         Calls callback with VideoInfo or None on completion.
         """
-        def worker():
-            result = self.extract(url)
-            callback(result)
-        
-        thread = threading.Thread(target=worker, daemon=True)
-        thread.start()
+        with self._workers_lock:
+            self._tasks.put((url, callback))
+            if len(self._workers) < self.MAX_WORKERS:
+                thread = threading.Thread(
+                    target=self._worker, daemon=True,
+                    name=f"video-extract-{len(self._workers)}"
+                )
+                self._workers.append(thread)
+                thread.start()
     
     def get_direct_url(self, url: str) -> Optional[str]:
         """Quick method to just get the direct playable URL."""
         info = self.extract(url)
         return info.direct_url if info else None
+    
+    def shutdown(self) -> None:
+        """
+        Drop queued extractions and stop the workers without waiting.
+        Each worker closes its own YoutubeDL once its current extraction
+        finishes; the calling thread's instance is closed here.
+        """
+        with self._workers_lock:
+            while True:
+                try:
+                    self._tasks.get_nowait()
+                except queue.Empty:
+                    break
+            for _ in self._workers:
+                self._tasks.put(None)
+            self._workers.clear()
+        self._close_local_ydl()
 
 
 # Singleton instance
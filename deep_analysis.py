@@ -7,10 +7,45 @@ import requests
 import uuid
 import json
 import re
+from http.cookiejar import DefaultCookiePolicy
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 url = 'https://live.douyin.com/198671092027'
 room_id = '198671092027'
 
+# Compresión que urllib3 sabe descomprimir: incluye br solo si hay brotli instalado
+ACCEPT_ENCODING = make_headers(accept_encoding=True)['accept-encoding']
+
+
+# Patrones de JSON embebido, compilados una sola vez con DOTALL.
+# Son de bytes: se aplican a r3.content sin decodificar la página.
+JSON_PATTERNS = [
+    re.compile(rb'<script[^>]*>\s*window\.__INIT_PROPS__\s*=\s*({.+?})\s*</script>', re.DOTALL),
+    re.compile(rb'<script[^>]*>\s*self\.__pace_f\s*=\s*(\[.+?\])\s*</script>', re.DOTALL),
+    re.compile(rb'<script[^>]*>.*?({.*?"roomStore".*?})', re.DOTALL),
+]
+META_CONTENT_RE = re.compile(rb'<meta[^>]+content="([^"]+)"[^>]*>')
+
+
+class NoStoreCookiePolicy(DefaultCookiePolicy):
+    """La sesión no guarda cookies recibidas: cada enfoque empieza limpio."""
+    
+    def set_ok(self, cookie, request):
+        return False
+
+
+# Una sola sesión para todos los enfoques: mismo host, conexión reutilizada
+session = requests.Session()
+session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=0))
+session.cookies.set_policy(NoStoreCookiePolicy())
+
 print("="*70)
 print("ENFOQUE 1: Probar con diferentes User-Agents")
 print("="*70)
@@ -20,7 +55,7 @@ mobile_headers = {
     'User-Agent': 'com.ss.android.ugc.aweme/110101 (Linux; U; Android 5.1.1; zh_CN; MI 9; Build/NMF26X; Cronet/TTNetVersion:b4d74d15 2020-04-23 QuicVersion:0144d358 2020-03-24)',
 }
 
-r1 = requests.get(url, headers=mobile_headers, timeout=10)
+r1 = session.get(url, headers=mobile_headers, timeout=10)
 print(f"Mobile UA - Length: {len(r1.text)} bytes")
 
 # Probar con User-Agent de desktop
@@ -28,7 +63,7 @@ desktop_headers = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36',
     'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
     'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-    'Accept-Encoding': 'gzip, deflate, br',
+    'Accept-Encoding': ACCEPT_ENCODING,
     'Connection': 'keep-alive',
     'Upgrade-Insecure-Requests': '1',
     'Sec-Fetch-Dest': 'document',
@@ -38,21 +73,19 @@ desktop_headers = {
     'Cache-Control': 'max-age=0',
 }
 
-r2 = requests.get(url, headers=desktop_headers, timeout=10)
+r2 = session.get(url, headers=desktop_headers, timeout=10)
 print(f"Desktop UA - Length: {len(r2.text)} bytes")
 
 print("\n" + "="*70)
 print("ENFOQUE 2: Seguir redirects y analizar")
 print("="*70)
 
-session = requests.Session()
-session.headers.update(desktop_headers)
-
 # Permitir redirects
-r3 = session.get(url, allow_redirects=True, timeout=10)
+r3 = session.get(url, headers=desktop_headers, allow_redirects=True, timeout=10)
 print(f"Final URL: {r3.url}")
 print(f"Status: {r3.status_code}")
-print(f"Length: {len(r3.text)} bytes")
+body = r3.content  # bytes: solo se decodifica lo que se imprime
+print(f"Length: {len(body)} bytes")
 
 # Ver si hay redirect a otra URL
 if r3.url != url:
@@ -69,35 +102,28 @@ print("\n" + "="*70)
 print("ENFOQUE 4: Analizar contenido del HTML")
 print("="*70)
 
-html = r3.text
-
 # Buscar cualquier JSON embebido
-json_patterns = [
-    r'<script[^>]*>\s*window\.__INIT_PROPS__\s*=\s*({.+?})\s*</script>',
-    r'<script[^>]*>\s*self\.__pace_f\s*=\s*(\[.+?\])\s*</script>',
-    r'<script[^>]*>.*?({.*?"roomStore".*?})',
-]
-
-for pattern in json_patterns:
-    matches = re.findall(pattern, html, re.DOTALL)
+for pattern in JSON_PATTERNS:
+    matches = pattern.findall(body)
     if matches:
-        print(f"\n✓ Pattern matched: {pattern[:60]}...")
+        print(f"\n✓ Pattern matched: {pattern.pattern[:60].decode()}...")
         print(f"Matches: {len(matches)}")
         try:
-            data = json.loads(matches[0])
+            data = orjson.loads(matches[0]) if ORJSON_AVAILABLE else json.loads(matches[0])
             print("JSON parsed successfully!")
             print(json.dumps(data, indent=2, ensure_ascii=False)[:500])
         except:
-            print(f"Preview: {matches[0][:200]}")
+            print(f"Preview: {matches[0][:200].decode('utf-8', 'replace')}")
 
 # Buscar meta tags con datos
-meta_content = re.findall(r'<meta[^>]+content="([^"]+)"[^>]*>', html)
+meta_content = META_CONTENT_RE.findall(body)
 print(f"\nMeta content tags: {len(meta_content)}")
 for content in meta_content[:5]:
+    content = content.decode('utf-8', 'replace')
     if len(content) > 50:
         print(f"  {content[:100]}...")
 
 print("\n" + "="*70)
 print("ENFOQUE 5: Imprimir HTML completo para análisis manual")
 print("="*70)
-print(html)
+print(body.decode(r3.encoding or 'utf-8', 'replace'))
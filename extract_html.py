@@ -1,3 +1,4 @@
+import codecs
 import requests
 
 url = 'https://live.douyin.com/198671092027'
@@ -6,18 +7,36 @@ headers = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
 }
 
-r = requests.get(url, headers=headers, timeout=10)
+session = requests.Session()
+session.headers.update(headers)
 
-# Save raw HTML
-with open('douyin_raw.html', 'wb') as f:
-    f.write(r.content)
+CHUNK_SIZE = 64 * 1024
 
-# Save decoded text
-with open('douyin_decoded.html', 'w', encoding='utf-8') as f:
-    f.write(r.text)
+# Save raw HTML, streamed to disk (iter_content undoes gzip/deflate)
+raw_bytes = 0
+with session.get(url, timeout=10, stream=True) as r, open('douyin_raw.html', 'wb') as f:
+    encoding = r.encoding or 'utf-8'
+    for chunk in r.iter_content(CHUNK_SIZE):
+        f.write(chunk)
+        raw_bytes += len(chunk)
+
+# Save decoded text, decoding the raw file chunk by chunk
+decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+decoded_chars = 0
+preview = ''
+with open('douyin_raw.html', 'rb') as src, open('douyin_decoded.html', 'w', encoding='utf-8') as dst:
+    while True:
+        chunk = src.read(CHUNK_SIZE)
+        text = decoder.decode(chunk, final=not chunk)
+        dst.write(text)
+        decoded_chars += len(text)
+        if len(preview) < 1000:
+            preview += text[:1000 - len(preview)]
+        if not chunk:
+            break
 
 print(f"Content saved")
-print(f"Raw bytes: {len(r.content)}")
-print(f"Decoded text: {len(r.text)} characters")
+print(f"Raw bytes: {raw_bytes}")
+print(f"Decoded text: {decoded_chars} characters")
 print(f"\nFirst 1000 characters:")
-print(r.text[:1000])
+print(preview)
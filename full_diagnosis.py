@@ -7,43 +7,95 @@ import requests
 import uuid
 import re
 import json
+from concurrent.futures import ThreadPoolExecutor
+from http.cookiejar import DefaultCookiePolicy
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
 
 url = 'https://live.douyin.com/198671092027'
 
+# Compresión que urllib3 sabe descomprimir: incluye br solo si hay brotli instalado
+ACCEPT_ENCODING = make_headers(accept_encoding=True)['accept-encoding']
+
+# Patrones compilados una sola vez (los conteos de literales usan str.count)
+FLV_URL_RE = re.compile(r'"(https?://[^"]+\.flv[^"]*)"')
+M3U8_URL_RE = re.compile(r'"(https?://[^"]+\.m3u8[^"]*)"')
+META_RE = re.compile(r'<meta[^>]+>')
+TITLE_RE = re.compile(r'<title>([^<]+)</title>')
+KEYWORDS = ('offline', 'error', 'redirect', 'login')
+# Lookahead: matches may overlap (e.g. 'offlinerror' holds 'offline' and 'error')
+KEYWORD_RE = re.compile(f"(?=({'|'.join(KEYWORDS)}))", re.IGNORECASE)
+
+# Caracteres conservados entre bloques para no perder una URL partida en dos.
+# Las URLs FLV de Douyin llevan firmas largas: 256 no bastan.
+STREAM_TAIL_CHARS = 4096
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+
+class NoStoreCookiePolicy(DefaultCookiePolicy):
+    """La sesión no guarda cookies recibidas: cada test envía solo las suyas."""
+    
+    def set_ok(self, cookie, request):
+        return False
+
+
+# Una sola sesión: todos los tests van al mismo host y reutilizan la conexión
+session = requests.Session()
+session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=0))
+session.headers.update(DEFAULT_HEADERS)
+session.cookies.set_policy(NoStoreCookiePolicy())
+
+
+
+def do_test(headers=None, cookies=None):
+    """Ejecuta un test (en un hilo del pool) y devuelve (status, html)."""
+    r = session.get(url, headers=headers, cookies=cookies, timeout=10)
+    return r.status_code, r.text
+
+
+def find_stream_url(session, url, headers=None, cookies=None):
+    """
+    Descarga la página por bloques y se detiene en la primera URL FLV.
+    Por el camino cuenta las menciones .flv/.m3u8 y guarda la primera URL M3U8.
+    Devuelve un dict; length y los conteos cubren lo leído hasta el corte.
+    """
+    result = {'status': None, 'length': 0, 'flv': 0, 'm3u8': 0,
+              'flv_url': None, 'm3u8_url': None}
+    with session.get(url, headers=headers, cookies=cookies, timeout=10, stream=True) as resp:
+        result['status'] = resp.status_code
+        # Sin charset declarado iter_content devolvería bytes
+        resp.encoding = resp.encoding or 'utf-8'
+        tail = ''
+        for chunk in resp.iter_content(chunk_size=16384, decode_unicode=True):
+            result['length'] += len(chunk)
+            # Solape de len(literal) - 1: una mención partida se cuenta una sola vez
+            result['flv'] += (tail[-3:] + chunk).count('.flv')
+            result['m3u8'] += (tail[-4:] + chunk).count('.m3u8')
+            window = tail + chunk
+            if result['m3u8_url'] is None:
+                match = M3U8_URL_RE.search(window)
+                if match:
+                    result['m3u8_url'] = match.group(1)
+            match = FLV_URL_RE.search(window)
+            if match:
+                result['flv_url'] = match.group(1)
+                break
+            tail = window[-STREAM_TAIL_CHARS:]
+    return result
+
+
 print("="*70)
 print("DIAGNÓSTICO EXHAUSTIVO - DOUYIN")
 print("="*70)
 
-# Test 1: Sin cookies
-print("\n[Test 1] Request sin cookies")
-print("-"*70)
-headers_basic = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-}
-r1 = requests.get(url, headers=headers_basic, timeout=10)
-print(f"Status: {r1.status_code}")
-print(f"Length: {len(r1.text)} bytes")
-flv1 = len(re.findall(r'\.flv', r1.text))
-print(f"FLV mentions: {flv1}")
-
-# Test 2: Con cookie __ac_nonce
-print("\n[Test 2] Request con cookie __ac_nonce")
-print("-"*70)
-cookies2 = {'__ac_nonce': uuid.uuid4().hex[:21]}
-r2 = requests.get(url, headers=headers_basic, cookies=cookies2, timeout=10)
-print(f"Status: {r2.status_code}")
-print(f"Length: {len(r2.text)} bytes")
-flv2 = len(re.findall(r'\.flv', r2.text))
-print(f"FLV mentions: {flv2}")
-
-# Test 3: Con headers completos
-print("\n[Test 3] Request con headers completos")
-print("-"*70)
 headers_full = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36',
     'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
     'Accept-Language': 'zh-CN,zh;q=0.9,en-US;q=0.8,en;q=0.7',
-    'Accept-Encoding': 'gzip, deflate, br',
+    'Accept-Encoding': ACCEPT_ENCODING,
     'Referer': 'https://www.douyin.com/',
     'Sec-Fetch-Dest': 'document',
     'Sec-Fetch-Mode': 'navigate',
@@ -51,71 +103,104 @@ headers_full = {
     'Sec-Fetch-User': '?1',
     'Upgrade-Insecure-Requests': '1',
 }
+cookies2 = {'__ac_nonce': uuid.uuid4().hex[:21]}
 cookies3 = {
     '__ac_nonce': uuid.uuid4().hex[:21],
     'ttwid': '1%7C' + uuid.uuid4().hex,
 }
-r3 = requests.get(url, headers=headers_full, cookies=cookies3, timeout=10)
-print(f"Status: {r3.status_code}")
-print(f"Length: {len(r3.text)} bytes")
-flv3 = len(re.findall(r'\.flv', r3.text))
-print(f"FLV mentions: {flv3}")
-
-# Test 4: Intentar extraer con browser_cookie3
-print("\n[Test 4] Intentando extraer cookies del navegador")
-print("-"*70)
+
+# Test 4: las cookies del navegador se leen de disco antes de lanzar las descargas
+browser_cookies = None
+browser_error = None
 try:
     import browser_cookie3
     
     # Try Chrome
     try:
         cj = browser_cookie3.chrome(domain_name='.douyin.com')
-        cookies_dict = {c.name: c.value for c in cj}
-        print(f"Cookies de Chrome: {len(cookies_dict)}")
-        if cookies_dict:
-            print(f"Cookie names: {list(cookies_dict.keys())[:5]}")
-            
-            r4 = requests.get(url, headers=headers_full, cookies=cookies_dict, timeout=10)
-            print(f"Status: {r4.status_code}")
-            print(f"Length: {len(r4.text)} bytes")
-            flv4 = len(re.findall(r'\.flv', r4.text))
-            m3u8_4 = len(re.findall(r'\.m3u8', r4.text))
-            print(f"FLV mentions: {flv4}")
-            print(f"M3U8 mentions: {m3u8_4}")
-            
-            # Buscar URLs completas
-            flv_urls = re.findall(r'"(https?://[^"]+\.flv[^"]*)"', r4.text)
-            m3u8_urls = re.findall(r'"(https?://[^"]+\.m3u8[^"]*)"', r4.text)
-            print(f"FLV URLs encontradas: {len(flv_urls)}")
-            print(f"M3U8 URLs encontradas: {len(m3u8_urls)}")
-            
-            if flv_urls:
-                print(f"\nPRIMERA URL FLV:")
-                print(flv_urls[0][:150])
-        else:
-            print("No se encontraron cookies")
+        browser_cookies = {c.name: c.value for c in cj}
     except Exception as e:
-        print(f"Error con Chrome: {e}")
+        browser_error = f"Error con Chrome: {e}"
         
 except ImportError:
-    print("browser_cookie3 no disponible")
+    browser_error = "browser_cookie3 no disponible"
+
+# Los tests son independientes: se lanzan a la vez sobre la sesión compartida
+with ThreadPoolExecutor(max_workers=4) as executor:
+    future1 = executor.submit(do_test)
+    future2 = executor.submit(do_test, cookies=cookies2)
+    future3 = executor.submit(do_test, headers=headers_full, cookies=cookies3)
+    # Solo interesa la primera URL FLV: se corta la descarga al encontrarla
+    future4 = None
+    if browser_cookies:
+        future4 = executor.submit(find_stream_url, session, url, headers=headers_full, cookies=browser_cookies)
+    
+    # Resultados en el orden original de los tests
+    tests = [
+        ("[Test 1] Request sin cookies", future1),
+        ("[Test 2] Request con cookie __ac_nonce", future2),
+        ("[Test 3] Request con headers completos", future3),
+    ]
+    for title, future in tests:
+        print(f"\n{title}")
+        print("-"*70)
+        status, text = future.result()
+        print(f"Status: {status}")
+        print(f"Length: {len(text)} bytes")
+        print(f"FLV mentions: {text.count('.flv')}")
+    
+    print("\n[Test 4] Intentando extraer cookies del navegador")
+    print("-"*70)
+    if browser_error:
+        print(browser_error)
+    else:
+        print(f"Cookies de Chrome: {len(browser_cookies)}")
+        if future4:
+            print(f"Cookie names: {list(browser_cookies.keys())[:5]}")
+            try:
+                result4 = future4.result()
+                print(f"Status: {result4['status']}")
+                cut = " (hasta la primera URL FLV)" if result4['flv_url'] else ""
+                print(f"Length: {result4['length']} bytes{cut}")
+                print(f"FLV mentions: {result4['flv']}")
+                print(f"M3U8 mentions: {result4['m3u8']}")
+                
+                if result4['m3u8_url']:
+                    print(f"\nPRIMERA URL M3U8:")
+                    print(result4['m3u8_url'][:150])
+                else:
+                    print("M3U8 URLs encontradas: 0")
+                
+                if result4['flv_url']:
+                    print(f"\nPRIMERA URL FLV:")
+                    print(result4['flv_url'][:150])
+                else:
+                    print("FLV URLs encontradas: 0")
+            except Exception as e:
+                print(f"Error con Chrome: {e}")
+        else:
+            print("No se encontraron cookies")
 
 # Test 5: Analizar contenido del HTML
 print("\n[Test 5] Análisis del contenido HTML")
 print("-"*70)
-html = r3.text
-print(f"Contiene 'offline': {'offline' in html.lower()}")
-print(f"Contiene 'error': {'error' in html.lower()}")
-print(f"Contiene 'redirect': {'redirect' in html.lower()}")
-print(f"Contiene 'login': {'login' in html.lower()}")
+html = future3.result()[1]
+# Una sola pasada para todas las palabras clave; se corta al verlas todas
+keyword_hits = set()
+for match in KEYWORD_RE.finditer(html):
+    keyword_hits.add(match.group(1).lower())
+    if len(keyword_hits) == len(KEYWORDS):
+        break
+for keyword in KEYWORDS:
+    print(f"Contiene '{keyword}': {keyword in keyword_hits}")
 print(f"Contiene 'script': {'<script' in html}")
 
 # Buscar meta tags
-meta_tags = re.findall(r'<meta[^>]+>', html)
+meta_tags = META_RE.findall(html)
 print(f"Meta tags: {len(meta_tags)}")
 
 # Buscar title
-title_match = re.search(r'<title>([^<]+)</title>', html)
+title_match = TITLE_RE.search(html)
 if title_match:
     print(f"Title: {title_match.group(1)}")
 
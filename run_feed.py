@@ -5,6 +5,7 @@ Communicates with main app via stdout.
 """
 
 import webview
+import json
 import sys
 import threading
 import time
@@ -63,11 +64,14 @@ def inject_styles(window):
         to { opacity: 1; transform: translateY(0); }
     }
     """
-    # Inject CSS
+    # Constructed stylesheet: parsed once by the CSS parser, no <style> element
+    # going through innerHTML. json.dumps makes the CSS a safe JS string literal.
     js = f"""
-    var style = document.createElement('style');
-    style.innerHTML = `{css}`;
-    document.head.appendChild(style);
+    if (!window.__douyinHdSheet) {{
+        window.__douyinHdSheet = new CSSStyleSheet();
+        window.__douyinHdSheet.replaceSync({json.dumps(css)});
+        document.adoptedStyleSheets = [...document.adoptedStyleSheets, window.__douyinHdSheet];
+    }}
     """
     window.evaluate_js(js)
 
@@ -93,6 +97,8 @@ def inject_interface(window):
             setTimeout(() => {
                  btn.innerHTML = '<span>✨ Ver en HD</span>';
                  btn.style.background = '';
+                 lastKey = '';  // label was overwritten - redraw the title
+                 scheduleUpdate();
             }, 2000);
             
             pywebview.api.play_hd(currentUrl);
@@ -100,8 +106,10 @@ def inject_interface(window):
     }
     
     // Logic to detect if a relevant video is present
-    setInterval(function() {
-        var btn = document.getElementById('douyin-hd-btn');
+    // The button is resolved once; lastKey remembers what it currently shows
+    var hdBtn = document.getElementById('douyin-hd-btn');
+    var lastKey = '';
+    function update() {
         var url = window.location.href;
         
         // 1. URL pattern check (Strong signal)
@@ -119,21 +127,70 @@ def inject_interface(window):
                 }
             }
         }
+        
+        var visible = isVideoUrl || hasVideo;
+        var title = visible ? document.title.split(' - ')[0] : ''; // Basic title cleanup
+        
+        // Nothing changed since the last update - skip the DOM writes
+        var key = visible + '|' + title;
+        if (key === lastKey) return;
+        lastKey = key;
 
-        if (isVideoUrl || hasVideo) {
-            if (!btn.classList.contains('visible')) {
-                btn.classList.add('visible');
+        if (visible) {
+            if (!hdBtn.classList.contains('visible')) {
+                hdBtn.classList.add('visible');
             }
             // Update title if possible
             try {
-               var title = document.title.split(' - ')[0]; // Basic title cleanup
                if (title.length > 20) title = title.substring(0, 20) + '...';
-               btn.innerHTML = '<span style="font-size:18px">▶</span> <div><div style="font-size:12px; opacity:0.8">Reproducir</div><div style="font-size:14px">'+title+'</div></div>';
+               hdBtn.innerHTML = '<span style="font-size:18px">▶</span> <div><div style="font-size:12px; opacity:0.8">Reproducir</div><div style="font-size:14px">'+title+'</div></div>';
             } catch(e) {}
         } else {
-             btn.classList.remove('visible');
+             hdBtn.classList.remove('visible');
         }
-    }, 800);
+    }
+    
+    // Bursts of events collapse into one update per animation frame
+    var updatePending = false;
+    function scheduleUpdate() {
+        if (updatePending) return;
+        updatePending = true;
+        requestAnimationFrame(function() {
+            updatePending = false;
+            update();
+        });
+    }
+    
+    // Event-driven instead of polling; hooks are installed once per page
+    if (!window.__douyinHdHooked) {
+        window.__douyinHdHooked = true;
+        var hdGrp = document.getElementById('douyin-hd-grp');
+        
+        // Page DOM changes (our own button updates are ignored, else they re-trigger)
+        new MutationObserver(function(records) {
+            for (var i = 0; i < records.length; i++) {
+                if (!hdGrp.contains(records[i].target)) {
+                    scheduleUpdate();
+                    return;
+                }
+            }
+        }).observe(document.body, {childList: true, subtree: true});
+        
+        // SPA navigation changes the URL without reloading
+        ['pushState', 'replaceState'].forEach(function(method) {
+            var original = history[method];
+            history[method] = function() {
+                var result = original.apply(this, arguments);
+                scheduleUpdate();
+                return result;
+            };
+        });
+        window.addEventListener('popstate', scheduleUpdate);
+        
+        // videoWidth is only known once metadata loads (media events don't bubble)
+        document.addEventListener('loadedmetadata', scheduleUpdate, true);
+    }
+    scheduleUpdate();
     """
     window.evaluate_js(js)
 
@@ -1,4 +1,5 @@
 import requests
+import shutil
 import uuid
 
 url = 'https://live.douyin.com/198671092027'
@@ -7,14 +8,16 @@ headers = {
 }
 cookies = {'__ac_nonce': uuid.uuid4().hex[:21]}
 
-r = requests.get(url, headers=headers, cookies=cookies, timeout=10)
+# Save to file: bytes go straight from the socket to disk, no decode/re-encode
+with requests.get(url, headers=headers, cookies=cookies, timeout=10, stream=True) as r, \
+        open('douyin_html.txt', 'wb') as f:
+    r.raw.decode_content = True  # undo gzip/deflate like r.content would
+    shutil.copyfileobj(r.raw, f, length=65536)
+    size = f.tell()
 
-# Save to file
-with open('douyin_html.txt', 'w', encoding='utf-8') as f:
-    f.write(r.text)
-
-print(f"HTML saved: {len(r.text)} bytes")
+print(f"HTML saved: {size} bytes")
 
 # Print first 2000 characters
 print("\nFirst 2000 characters:")
-print(r.text[:2000])
+with open('douyin_html.txt', 'rb') as f:
+    print(f.read(2000).decode('utf-8', 'replace'))
@@ -28,7 +28,7 @@ headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/
 r = requests.get('https://live.douyin.com/94782239787', headers=headers, cookies=cookies)
 
 extractor = AdaptiveExtractor()
-result = extractor.extract(r.text)
+result = extractor.extract(r.content)
 
 if result:
     print(f"✓ Extraction successful!")
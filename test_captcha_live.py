@@ -27,7 +27,7 @@ print("INSTRUCCIONES:")
 print("1. Cuando Chrome se abra, verás la página de Douyin con CAPTCHA")
 print("2. Resuelve el CAPTCHA (desliza la pieza al lugar correcto)")
 print("3. Espera a que la página se recargue")
-print("4. Chrome se cerrará automáticamente")
+print("4. Chrome se minimizará automáticamente")
 print("5. El stream debería reproducirse")
 print()
 print("="*80)
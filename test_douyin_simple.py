@@ -2,6 +2,9 @@ import requests
 import uuid
 import re
 
+# FLV and M3U8 URLs share one compiled pattern so the page is scanned once
+STREAM_URL_RE = re.compile(r'"(?P<url>https?://[^"]+\.(?P<ext>flv|m3u8)[^"]*)"')
+
 # Fetch page
 cookies = {'__ac_nonce': uuid.uuid4().hex[:21]}
 headers = {
@@ -13,9 +16,12 @@ print("Fetching Douyin page...")
 r = requests.get('https://live.douyin.com/94782239787', headers=headers, cookies=cookies, timeout=10)
 print(f"Status: {r.status_code}, Length: {len(r.text)}")
 
+flv_urls, m3u8_urls = [], []
+for m in STREAM_URL_RE.finditer(r.text):
+    (flv_urls if m['ext'] == 'flv' else m3u8_urls).append(m['url'])
+
 # Method 1: Direct FLV URL extraction
 print("\n=== Method 1: Direct FLV URL search ===")
-flv_urls = re.findall(r'"(https?://[^"]+\.flv[^"]*)"', r.text)
 print(f"FLV URLs found: {len(flv_urls)}")
 if flv_urls:
     print(f"First FLV URL: {flv_urls[0][:120]}")
@@ -23,7 +29,6 @@ if flv_urls:
 
 # Method 2: M3U8 URLs as fallback
 print("\n=== Method 2: M3U8 URL search ===")
-m3u8_urls = re.findall(r'"(https?://[^"]+\.m3u8[^"]*)"', r.text)
 print(f"M3U8 URLs found: {len(m3u8_urls)}")
 if m3u8_urls:
     print(f"First M3U8 URL: {m3u8_urls[0][:120]}")
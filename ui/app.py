@@ -10,6 +10,7 @@ from pathlib import Path
 
 from config.settings_manager import get_settings, SettingsManager
 from core.stream_engine import StreamEngine
+from core.stream_checker import StreamChecker
 from core.clipboard_monitor import ClipboardMonitor
 from core.recorder import Recorder, RecorderState
 from core.player_manager import PlayerManager, PlayerType
@@ -44,6 +45,8 @@ class DouyinStreamApp(ctk.CTk):
         # Initialize core components
         self._settings = get_settings()
         self._stream_engine = StreamEngine()
+        # One checker for the app lifetime so its status cache survives refreshes
+        self._stream_checker = StreamChecker(self._stream_engine)
         self._clipboard_monitor = ClipboardMonitor()
         self._recorder = Recorder()
         self._player_manager = PlayerManager()
@@ -1099,9 +1102,7 @@ class DouyinStreamApp(ctk.CTk):
         
         def check_in_background():
             """Background thread for checking streams."""
-            from core.stream_checker import StreamChecker
-            
-            checker = StreamChecker(self._stream_engine)
+            checker = self._stream_checker
             
             def on_progress(url, status):
                 """Update UI on main thread."""
@@ -1341,6 +1342,7 @@ class DouyinStreamApp(ctk.CTk):
         # Save window geometry
         try:
             self._settings.set("window_geometry", self.geometry())
+            self._settings.flush()
         except Exception:
             pass
         